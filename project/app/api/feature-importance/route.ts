@@ -0,0 +1,25 @@
+import { NextResponse } from "next/server"
+import { readFile } from "fs/promises"
+import path from "path"
+
+// Written by scripts/model_training.py (scripts/feature_importance.py, DEFAULT_IMPORTANCE_PATH)
+const FEATURE_IMPORTANCE_PATH =
+  process.env.FEATURE_IMPORTANCE_PATH || path.join(process.cwd(), "scripts", "results", "feature_importance.json")
+
+export async function GET() {
+  let contents: string
+  try {
+    contents = await readFile(FEATURE_IMPORTANCE_PATH, "utf-8")
+  } catch (error) {
+    return NextResponse.json(
+      { success: false, message: "No feature importance yet. Train the models to generate it." },
+      { status: 404 },
+    )
+  }
+
+  try {
+    return NextResponse.json({ success: true, importance: JSON.parse(contents) })
+  } catch (error) {
+    return NextResponse.json({ success: false, message: "Failed to read feature importance" }, { status: 500 })
+  }
+}
@@ -0,0 +1,54 @@
+import { type NextRequest, NextResponse } from "next/server"
+
+// Local Python prediction server (scripts/prediction_server.py)
+const PREDICTION_SERVER_URL = process.env.PREDICTION_SERVER_URL || "http://127.0.0.1:8001"
+
+// Upstream statuses the client should see as-is: bad input, overloaded, timed out
+const PASSTHROUGH_STATUSES = [400, 503, 504]
+
+// The model is trained on a 0-4 GPA scale, the UI stores previous results as percentages
+function toModelInput(student: any) {
+  if (student.previous_performance === undefined && student.previous_percentage !== undefined) {
+    return { ...student, previous_performance: student.previous_percentage / 25 }
+  }
+  return student
+}
+
+export async function POST(request: NextRequest) {
+  try {
+    const body = await request.json()
+    const students = Array.isArray(body.students) ? body.students : [body]
+
+    const response = await fetch(`${PREDICTION_SERVER_URL}/predict`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ students: students.map(toModelInput) }),
+    })
+    const data = await response.json()
+
+    if (!response.ok || !data.success) {
+      return NextResponse.json(
+        { success: false, message: data.message || "Prediction failed" },
+        { status: PASSTHROUGH_STATUSES.includes(response.status) ? response.status : 502 },
+      )
+    }
+
+    return NextResponse.json({
+      success: true,
+      predictions: data.predictions,
+      count: data.predictions.length,
+    })
+  } catch (error) {
+    return NextResponse.json({ success: false, message: "Prediction server unavailable" }, { status: 503 })
+  }
+}
+
+export async function GET() {
+  try {
+    const response = await fetch(`${PREDICTION_SERVER_URL}/stats`)
+    const data = await response.json()
+    return NextResponse.json(data)
+  } catch (error) {
+    return NextResponse.json({ success: false, message: "Prediction server unavailable" }, { status: 503 })
+  }
+}
@@ -1,31 +1,61 @@
-import { NextResponse } from "next/server"
+import { type NextRequest, NextResponse } from "next/server"
 
-export async function POST() {
-  try {
-    // In a real application, this would trigger the Python ML training script
-    console.log("Starting model training...")
+// Local Python training job server (scripts/training_jobs.py)
+const TRAINING_SERVER_URL = process.env.TRAINING_SERVER_URL || "http://127.0.0.1:8002"
 
-    // Simulate training time
-    await new Promise((resolve) => setTimeout(resolve, 2000))
+// Queues a training job and returns at once; poll GET ?id=<job id> for progress
+export async function POST(request: NextRequest) {
+  try {
+    const body = await request.json().catch(() => ({}))
+    const response = await fetch(`${TRAINING_SERVER_URL}/jobs`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ models: body.models, n_jobs: body.n_jobs }),
+    })
+    const data = await response.json()
 
-    const results = {
-      models: [
-        { name: "Logistic Regression", accuracy: 0.82, precision: 0.79, recall: 0.85, f1_score: 0.82 },
-        { name: "Random Forest", accuracy: 0.89, precision: 0.87, recall: 0.91, f1_score: 0.89 },
-        { name: "Support Vector Machine", accuracy: 0.85, precision: 0.83, recall: 0.87, f1_score: 0.85 },
-        { name: "K-Nearest Neighbors", accuracy: 0.78, precision: 0.76, recall: 0.8, f1_score: 0.78 },
-        { name: "XGBoost", accuracy: 0.91, precision: 0.89, recall: 0.93, f1_score: 0.91 },
-      ],
-      best_model: "XGBoost",
-      training_time: "45 seconds",
+    if (!response.ok || !data.success) {
+      return NextResponse.json(
+        { success: false, message: data.message || "Failed to start training" },
+        { status: response.status === 400 ? 400 : 502 },
+      )
     }
 
-    return NextResponse.json({
-      success: true,
-      message: "Models trained successfully",
-      results,
+    return NextResponse.json({ success: true, message: "Training job queued", job: data.job }, { status: 202 })
+  } catch (error) {
+    return NextResponse.json({ success: false, message: "Training server unavailable" }, { status: 503 })
+  }
+}
+
+// One job with ?id=<job id>, otherwise all jobs, newest first
+export async function GET(request: NextRequest) {
+  try {
+    const id = request.nextUrl.searchParams.get("id")
+    const response = await fetch(`${TRAINING_SERVER_URL}/jobs${id ? `/${encodeURIComponent(id)}` : ""}`, {
+      cache: "no-store",
+    })
+    const data = await response.json()
+    return NextResponse.json(data, { status: response.status })
+  } catch (error) {
+    return NextResponse.json({ success: false, message: "Training server unavailable" }, { status: 503 })
+  }
+}
+
+// Cancels a queued or running job given as ?id=<job id>
+export async function DELETE(request: NextRequest) {
+  try {
+    const id = request.nextUrl.searchParams.get("id")
+    if (!id) {
+      return NextResponse.json({ success: false, message: "Missing job id" }, { status: 400 })
+    }
+    const response = await fetch(`${TRAINING_SERVER_URL}/jobs/${encodeURIComponent(id)}/cancel`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: "{}",
     })
+    const data = await response.json()
+    return NextResponse.json(data, { status: response.status })
   } catch (error) {
-    return NextResponse.json({ success: false, message: "Failed to train models" }, { status: 500 })
+    return NextResponse.json({ success: false, message: "Training server unavailable" }, { status: 503 })
   }
 }
@@ -36,14 +36,43 @@ interface Student {
   current_percentage: number
 }
 
+interface FeatureImportance {
+  feature: string
+  importance_mean: number
+  importance_std: number
+}
+
+// Permutation importance written by scripts/model_training.py
+interface ImportanceReport {
+  generated_at: string
+  metric: string
+  n_repeats: number
+  models: Record<string, { baseline_score: number; features: FeatureImportance[] }>
+}
+
 export default function Analytics() {
   const [students, setStudents] = useState<Student[]>([])
   const [isLoading, setIsLoading] = useState(true)
+  const [importance, setImportance] = useState<ImportanceReport | null>(null)
 
   useEffect(() => {
     fetchStudents()
+    fetchImportance()
   }, [])
 
+  // Optional: the chart is simply left out until the models have been trained
+  const fetchImportance = async () => {
+    try {
+      const response = await fetch("/api/feature-importance")
+      const data = await response.json()
+      if (response.ok && data.success) {
+        setImportance(data.importance)
+      }
+    } catch (error) {
+      setImportance(null)
+    }
+  }
+
   const fetchStudents = async () => {
     try {
       const response = await fetch("/api/students")
@@ -152,6 +181,17 @@ export default function Analytics() {
   const averagePercentage = (students.reduce((sum, s) => sum + s.previous_percentage, 0) / students.length).toFixed(1)
   const passRate = ((students.filter((s) => s.current_percentage >= 60).length / students.length) * 100).toFixed(1)
 
+  // Importance of the most accurate model, largest first
+  const importanceModel = importance
+    ? Object.entries(importance.models).sort(([, a], [, b]) => b.baseline_score - a.baseline_score)[0]
+    : undefined
+  const importanceData = importanceModel
+    ? importanceModel[1].features.map((item) => ({
+        feature: item.feature.replace(/_/g, " "),
+        importance: Number(item.importance_mean.toFixed(4)),
+      }))
+    : []
+
   const COLORS = ["#0088FE", "#00C49F", "#FFBB28", "#FF8042", "#8884D8", "#82CA9D"]
 
   return (
@@ -292,6 +332,29 @@ export default function Analytics() {
         </Card>
       </div>
 
+      {importanceModel && (
+        <Card>
+          <CardHeader>
+            <CardTitle>Feature Importance</CardTitle>
+            <CardDescription>
+              Drop in {importance?.metric} when each feature is shuffled ({importanceModel[0]}, trained{" "}
+              {new Date(importance!.generated_at).toLocaleDateString()})
+            </CardDescription>
+          </CardHeader>
+          <CardContent>
+            <ResponsiveContainer width="100%" height={350}>
+              <BarChart data={importanceData} layout="vertical" margin={{ left: 60 }}>
+                <CartesianGrid strokeDasharray="3 3" />
+                <XAxis type="number" />
+                <YAxis type="category" dataKey="feature" width={160} />
+                <Tooltip formatter={(value) => [value, "Importance"]} />
+                <Bar dataKey="importance" fill="#6366F1" />
+              </BarChart>
+            </ResponsiveContainer>
+          </CardContent>
+        </Card>
+      )}
+
       <Card>
         <CardHeader>
           <CardTitle>Key Insights</CardTitle>
@@ -29,67 +29,66 @@ export default function ModelTraining() {
     { name: "XGBoost", accuracy: 0, precision: 0, recall: 0, f1_score: 0, status: "pending" },
   ])
 
+  const applyJob = (job: any) => {
+    const names = Object.keys(job.models)
+    const finished = names.filter((name) => job.models[name].status === "completed").length
+    setProgress(names.length ? (finished / names.length) * 100 : 0)
+    setModels((prev) =>
+      prev.map((model) => {
+        const result = job.models[model.name]
+        if (!result) return model
+        const failed = job.status === "failed" || job.status === "cancelled"
+        return {
+          ...model,
+          accuracy: result.accuracy ?? 0,
+          precision: result.precision ?? 0,
+          recall: result.recall ?? 0,
+          f1_score: result.f1_score ?? 0,
+          status: result.status === "completed" ? "completed" : failed ? "error" : result.status,
+        }
+      }),
+    )
+  }
+
   const startTraining = async () => {
     setIsTraining(true)
     setProgress(0)
 
     try {
+      // The job runs in the background; poll it until it finishes
       const response = await fetch("/api/train-models", {
         method: "POST",
       })
+      const data = await response.json()
+      if (!response.ok || !data.success) {
+        throw new Error(data.message)
+      }
 
-      if (response.ok) {
-        // Simulate training progress
-        const interval = setInterval(() => {
-          setProgress((prev) => {
-            if (prev >= 100) {
-              clearInterval(interval)
-              setIsTraining(false)
-              // Update models with mock results
-              setModels([
-                {
-                  name: "Logistic Regression",
-                  accuracy: 0.82,
-                  precision: 0.79,
-                  recall: 0.85,
-                  f1_score: 0.82,
-                  status: "completed",
-                },
-                {
-                  name: "Random Forest",
-                  accuracy: 0.89,
-                  precision: 0.87,
-                  recall: 0.91,
-                  f1_score: 0.89,
-                  status: "completed",
-                },
-                {
-                  name: "Support Vector Machine",
-                  accuracy: 0.85,
-                  precision: 0.83,
-                  recall: 0.87,
-                  f1_score: 0.85,
-                  status: "completed",
-                },
-                {
-                  name: "K-Nearest Neighbors",
-                  accuracy: 0.78,
-                  precision: 0.76,
-                  recall: 0.8,
-                  f1_score: 0.78,
-                  status: "completed",
-                },
-                { name: "XGBoost", accuracy: 0.91, precision: 0.89, recall: 0.93, f1_score: 0.91, status: "completed" },
-              ])
-              toast({
-                title: "Training Complete",
-                description: "All models have been trained successfully!",
-              })
-              return 100
-            }
-            return prev + 2
-          })
-        }, 100)
+      let job = data.job
+      applyJob(job)
+      while (!["completed", "failed", "cancelled"].includes(job.status)) {
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        const poll = await fetch(`/api/train-models?id=${job.id}`)
+        const pollData = await poll.json()
+        if (!poll.ok || !pollData.success) {
+          throw new Error(pollData.message)
+        }
+        job = pollData.job
+        applyJob(job)
+      }
+
+      setIsTraining(false)
+      if (job.status === "completed") {
+        toast({
+          title: "Training Complete",
+          description: `All models have been trained successfully! Best model: ${job.best_model}`,
+        })
+      } else {
+        toast({
+          title: "Training Failed",
+          description: job.error || "The training job did not complete.",
+          variant: "destructive",
+        })
       }
     } catch (error) {
       setIsTraining(false)
@@ -0,0 +1,143 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from prediction_engine import StudentPerformancePredictor
+
+_worker_predictor = None
+
+class PredictorBusyError(RuntimeError):
+    """
+    Raised when too many calls are already waiting for a free slot
+    """
+
+def _init_worker(model_path):
+    global _worker_predictor
+    _worker_predictor = StudentPerformancePredictor()
+    _worker_predictor.load_model(model_path)
+
+def _predict_in_worker(student_data):
+    return _worker_predictor.predict(student_data)
+
+def _batch_predict_in_worker(students_data, chunk_size):
+    return _worker_predictor.batch_predict(students_data, chunk_size)
+
+class AsyncPredictor:
+    """
+    Asyncio facade over a blocking predictor
+    
+    Scoring runs in a thread pool (sharing the given predictor or
+    ModelRegistry) or in a process pool whose workers each load model_path.
+    At most max_concurrency calls occupy the pool; a slot is only released
+    when the pool has actually finished the work, so cancelled or timed-out
+    calls cannot pile up hidden CPU load. With max_pending set, calls beyond
+    that many waiting for a slot fail fast with PredictorBusyError.
+    
+    Threads still share the GIL with the event loop during pandas-heavy
+    batches; use executor='process' when that delay matters.
+    """
+    
+    def __init__(self, predictor=None, model_path=None, executor='thread', max_workers=None,
+                 max_concurrency=None, max_pending=None, timeout=None):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor type: {executor}")
+        if executor == 'process' and model_path is None:
+            raise ValueError("A process pool needs model_path so each worker can load the model")
+        if executor == 'thread' and predictor is None:
+            if model_path is None:
+                raise ValueError("Pass a loaded predictor or a model_path")
+            predictor = StudentPerformancePredictor()
+            predictor.load_model(model_path)
+        
+        self.predictor = predictor
+        self.executor_type = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        
+        if executor == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(model_path,))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='predict')
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._stats = {'completed': 0, 'failed': 0, 'timeouts': 0, 'cancelled': 0, 'rejected': 0}
+    
+    async def predict(self, student_data, timeout=None):
+        """
+        Score one student without blocking the event loop
+        """
+        if self.executor_type == 'process':
+            return await self._run(timeout, _predict_in_worker, student_data)
+        return await self._run(timeout, self.predictor.predict, student_data)
+    
+    async def batch_predict(self, students_data, chunk_size=10000, timeout=None):
+        """
+        Score a batch of students without blocking the event loop
+        """
+        students_data = list(students_data)
+        if self.executor_type == 'process':
+            return await self._run(timeout, _batch_predict_in_worker, students_data, chunk_size)
+        return await self._run(timeout, self.predictor.batch_predict, students_data, chunk_size)
+    
+    async def _run(self, timeout, func, *args):
+        """
+        Run func in the pool under the concurrency limit, cancelling it on timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.max_pending is not None and self._semaphore.locked() and self._waiting >= self.max_pending:
+            self._stats['rejected'] += 1
+            raise PredictorBusyError(f"{self._waiting} prediction calls are already waiting")
+        
+        try:
+            result = await asyncio.wait_for(self._submit(func, *args), timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            raise
+        except asyncio.CancelledError:
+            self._stats['cancelled'] += 1
+            raise
+        except Exception:
+            self._stats['failed'] += 1
+            raise
+        self._stats['completed'] += 1
+        return result
+    
+    async def _submit(self, func, *args):
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        # Release from the loop thread once the pool is done, even if the caller gave up
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._semaphore.release))
+        # Cancelling the awaiting task cancels work that has not started yet
+        return await asyncio.wrap_future(future)
+    
+    def stats(self):
+        stats = dict(self._stats)
+        stats['waiting'] = self._waiting
+        stats['max_concurrency'] = self.max_concurrency
+        return stats
+    
+    def close(self, wait=True):
+        """
+        Shut down the pool, dropping calls that have not started
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        # Joining the pool blocks, so do it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
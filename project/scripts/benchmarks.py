@@ -0,0 +1,613 @@
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from data_preprocessing import load_and_preprocess_data, encode_categorical_features, main as preprocess_data
+from sklearn.ensemble import RandomForestClassifier
+from model_training import train_random_forest, train_xgboost, train_svm
+from prediction_engine import StudentPerformancePredictor, TREE_ENGINE_MAX_ROWS
+from tree_engine import FlatTreeEnsemble
+from neighbor_index import IndexedKNNClassifier
+from instrumentation import PredictionInstrumentation
+
+def build_predictor(train_func=train_random_forest):
+    """
+    Train a model on the preprocessed sample data and wrap it in a predictor
+    """
+    data = preprocess_data()
+    model = train_func(data['X_train'], data['y_train'])
+    return StudentPerformancePredictor(model=model, scaler=data['scaler'])
+
+def sample_students(n_students, random_state=0):
+    """
+    Generate raw student records in the format accepted by predict()
+    """
+    df = load_and_preprocess_data(n_samples=n_students, random_state=random_state)
+    return df.drop(columns='performance').to_dict('records')
+
+def compare_results(expected, actual):
+    """
+    Compare two lists of prediction results, returning the number of mismatching rows
+    and the largest probability difference
+    """
+    mismatches = 0
+    max_prob_diff = 0.0
+    for a, b in zip(expected, actual):
+        if (a['predicted_performance'] != b['predicted_performance'] or
+                a['risk_level'] != b['risk_level'] or
+                a['recommendations'] != b['recommendations']):
+            mismatches += 1
+        max_prob_diff = max(max_prob_diff,
+                            abs(a['probability_pass'] - b['probability_pass']),
+                            abs(a['confidence'] - b['confidence']))
+    return mismatches, max_prob_diff
+
+def benchmark_batch_predict(predictor, n_students=200000, chunk_size=10000, n_reference=1000):
+    """
+    Measure batch_predict throughput in rows per second against the per-row predict loop
+    """
+    students = sample_students(n_students)
+    
+    # Per-row baseline on a subset, it is far too slow for the whole cohort
+    reference = students[:n_reference]
+    start = time.perf_counter()
+    expected = [predictor.predict(student) for student in reference]
+    per_row_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    results = predictor.batch_predict(students, chunk_size=chunk_size)
+    batch_seconds = time.perf_counter() - start
+    
+    mismatches, max_prob_diff = compare_results(expected, results[:n_reference])
+    
+    report = {
+        'n_students': n_students,
+        'chunk_size': chunk_size,
+        'per_row_rows_per_sec': len(reference) / per_row_seconds,
+        'batch_rows_per_sec': n_students / batch_seconds,
+        'mismatches': mismatches,
+        'max_probability_diff': max_prob_diff
+    }
+    
+    print(f"\nbatch_predict: {n_students} students, chunk_size={chunk_size}")
+    print(f"Per-row predict: {report['per_row_rows_per_sec']:,.0f} rows/sec")
+    print(f"batch_predict:   {report['batch_rows_per_sec']:,.0f} rows/sec")
+    print(f"Mismatching rows: {mismatches} (max probability diff {max_prob_diff:.2e})")
+    
+    return report
+
+def latency_percentiles(timings):
+    """
+    Summarize a list of call durations in seconds as p50/p99 in microseconds
+    """
+    timings = np.asarray(timings) * 1e6
+    return {'p50_us': float(np.percentile(timings, 50)), 'p99_us': float(np.percentile(timings, 99))}
+
+def benchmark_single_predict(predictor, n_calls=2000):
+    """
+    Measure single-student encoding and predict latency for the pandas and precompiled paths
+    """
+    students = sample_students(n_calls)
+    
+    pandas_timings = []
+    encoder_timings = []
+    predict_timings = []
+    max_diff = 0.0
+    for student in students:
+        start = time.perf_counter()
+        df_encoded = encode_categorical_features(pd.DataFrame([student]))
+        expected = predictor.scaler.transform(df_encoded[predictor.feature_names])
+        pandas_timings.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        X = predictor.preprocess_input(student)
+        encoder_timings.append(time.perf_counter() - start)
+        max_diff = max(max_diff, float(np.abs(expected - X).max()))
+        
+        start = time.perf_counter()
+        predictor.predict(student)
+        predict_timings.append(time.perf_counter() - start)
+    
+    report = {
+        'pandas_encoding': latency_percentiles(pandas_timings),
+        'precompiled_encoding': latency_percentiles(encoder_timings),
+        'predict': latency_percentiles(predict_timings),
+        'max_feature_diff': max_diff
+    }
+    
+    print(f"\nSingle-student latency over {n_calls} calls (p50 / p99)")
+    for stage in ['pandas_encoding', 'precompiled_encoding', 'predict']:
+        print(f"{stage}: {report[stage]['p50_us']:.1f} / {report[stage]['p99_us']:.1f} us")
+    print(f"Max feature difference vs pandas path: {max_diff:.2e}")
+    
+    return report
+
+def benchmark_instrumentation_overhead(predictor, n_calls=2000, n_batch=1000, repeats=3):
+    """
+    Measure predict and batch_predict latency with instrumentation disabled and enabled
+    
+    Disabled and enabled calls alternate so drift in machine load affects both equally.
+    """
+    students = sample_students(max(n_calls, n_batch))
+    instrumentation = PredictionInstrumentation()
+    previous = predictor.instrumentation
+    
+    timings = {'disabled': [], 'enabled': []}
+    batch_timings = {'disabled': [], 'enabled': []}
+    try:
+        for _ in range(repeats):
+            for student in students[:n_calls]:
+                for mode in ('disabled', 'enabled'):
+                    predictor.instrumentation = instrumentation if mode == 'enabled' else None
+                    start = time.perf_counter()
+                    predictor.predict(student)
+                    timings[mode].append(time.perf_counter() - start)
+            for mode in ('disabled', 'enabled'):
+                predictor.instrumentation = instrumentation if mode == 'enabled' else None
+                start = time.perf_counter()
+                predictor.batch_predict(students[:n_batch])
+                batch_timings[mode].append(time.perf_counter() - start)
+    finally:
+        predictor.instrumentation = previous
+    
+    report = {mode: latency_percentiles(mode_timings) for mode, mode_timings in timings.items()}
+    report['batch_ms'] = {mode: float(np.median(mode_timings)) * 1000 for mode, mode_timings in batch_timings.items()}
+    report['stages'] = instrumentation.snapshot()
+    
+    print(f"\nInstrumentation overhead over {n_calls * repeats} predict calls (p50 / p99)")
+    for mode in ('disabled', 'enabled'):
+        print(f"{mode}: {report[mode]['p50_us']:.1f} / {report[mode]['p99_us']:.1f} us, "
+              f"batch_predict({n_batch}) {report['batch_ms'][mode]:.2f} ms")
+    for operation, models in report['stages'].items():
+        for model_type, stages in models.items():
+            print(f"{operation} ({model_type}):")
+            for stage, stats in stages.items():
+                print(f"  {stage:<16} p50 {stats['p50_ms']:.3f} ms, p95 {stats['p95_ms']:.3f} ms, "
+                      f"p99 {stats['p99_ms']:.3f} ms")
+    
+    return report
+
+COLD_START_SCRIPTS = {
+    'prediction_engine': (
+        "from prediction_engine import StudentPerformancePredictor\n"
+        "predictor = StudentPerformancePredictor()\n"
+        "predictor.load_model(model_path)\n"
+        "predictor.predict(student)\n"
+    ),
+    'standalone_scorer': (
+        "from standalone_scorer import load_scorer\n"
+        "load_scorer(scorer_path).predict_proba(student)\n"
+    )
+}
+
+def benchmark_cold_start(predictor, n_runs=3):
+    """
+    Time a fresh interpreter from first import to first prediction, full engine vs standalone scorer
+    """
+    student = sample_students(1)[0]
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, 'model.pkl')
+        scorer_path = os.path.join(tmp_dir, 'scorer')
+        predictor.save_model(model_path)
+        predictor.save_model(scorer_path, artifact_format='standalone')
+        
+        for name, body in COLD_START_SCRIPTS.items():
+            script = (
+                "import time, json\n"
+                "start = time.perf_counter()\n"
+                f"model_path, scorer_path = {model_path!r}, {scorer_path!r}\n"
+                f"student = json.loads({json.dumps(json.dumps(student))})\n"
+                f"{body}"
+                "print(time.perf_counter() - start)\n"
+            )
+            timings = []
+            for _ in range(n_runs):
+                output = subprocess.run([sys.executable, '-c', script], cwd=scripts_dir, check=True,
+                                        capture_output=True, text=True).stdout
+                timings.append(float(output.strip().splitlines()[-1]))
+            report[name] = {'first_prediction_ms': float(np.median(timings)) * 1000}
+    
+    print("\nCold start: fresh interpreter to first prediction (median)")
+    for name, stats in report.items():
+        print(f"{name}: {stats['first_prediction_ms']:.0f} ms")
+    
+    return report
+
+def benchmark_explanations(predictor, n_students=100000):
+    """
+    Compare explain_batch against risk_report on the same cohort and check additivity
+    """
+    df = pd.DataFrame(sample_students(n_students))
+    
+    start = time.perf_counter()
+    predictor.risk_report(df)
+    score_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    explanation = predictor.explain_batch(df)
+    explain_seconds = time.perf_counter() - start
+    
+    # The contributions must add up to the model's own output
+    X = predictor.preprocess_input(df)
+    if explanation.attrs['output'] == 'probability':
+        expected = predictor.model.predict_proba(X)[:, 1]
+    elif hasattr(predictor.model, 'get_booster'):
+        expected = predictor.model.predict(X, output_margin=True)
+    else:
+        expected = predictor.model.decision_function(X)
+    
+    report = {
+        'n_students': n_students,
+        'score_seconds': score_seconds,
+        'explain_seconds': explain_seconds,
+        'cost_ratio': explain_seconds / score_seconds,
+        'max_additivity_error': float(np.abs(explanation['prediction'].to_numpy() - expected).max())
+    }
+    
+    print(f"\nExplanations for {n_students} students ({type(predictor.model).__name__}, {explanation.attrs['output']})")
+    print(f"risk_report: {score_seconds:.2f}s, explain_batch: {explain_seconds:.2f}s ({report['cost_ratio']:.1f}x)")
+    print(f"Max additivity error: {report['max_additivity_error']:.1e}")
+    
+    return report
+
+# Cold import budgets for the inference entry points, and packages they must not pull in;
+# prediction_engine measures about 210-230 ms, so its budget leaves roughly 1.5x headroom
+IMPORT_TIME_BUDGETS_MS = {
+    'prediction_engine': 350,
+    'standalone_scorer': 250
+}
+FORBIDDEN_INFERENCE_IMPORTS = ['matplotlib', 'seaborn', 'sklearn', 'scipy', 'xgboost', 'joblib']
+
+def measure_import(module, n_runs=5):
+    """
+    Median cumulative `python -X importtime` of a module in fresh interpreters, plus the packages it loaded
+    """
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    script = f"import sys, {module}; print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    timings = []
+    for _ in range(n_runs):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], cwd=scripts_dir,
+                                   check=True, capture_output=True, text=True)
+        # Lines look like "import time: self [us] | cumulative | imported package"
+        for line in completed.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module and not fields[2].startswith('  '):
+                timings.append(int(fields[1]) / 1000)
+        packages = completed.stdout.split()
+    return float(np.median(timings)), packages
+
+def benchmark_import_time(budgets_ms=None, n_runs=5):
+    """
+    Check cold import time of the prediction path against its budget
+    
+    Raises RuntimeError if a module exceeds its budget or imports a
+    plotting or training library, so it can gate CI.
+    """
+    budgets_ms = budgets_ms or IMPORT_TIME_BUDGETS_MS
+    report = {}
+    failures = []
+    print(f"\nCold import time (median of {n_runs} interpreters)")
+    for module, budget_ms in budgets_ms.items():
+        import_ms, packages = measure_import(module, n_runs)
+        forbidden = [package for package in FORBIDDEN_INFERENCE_IMPORTS if package in packages]
+        report[module] = {'import_ms': import_ms, 'budget_ms': budget_ms, 'forbidden_imports': forbidden}
+        print(f"{module}: {import_ms:.0f} ms (budget {budget_ms} ms)"
+              + (f", imports {', '.join(forbidden)}" if forbidden else ""))
+        if import_ms > budget_ms:
+            failures.append(f"{module} took {import_ms:.0f} ms to import, over its {budget_ms} ms budget")
+        if forbidden:
+            failures.append(f"{module} imports {', '.join(forbidden)}")
+    
+    if failures:
+        raise RuntimeError("Import time regression: " + "; ".join(failures))
+    return report
+
+def process_memory_mb():
+    """
+    Resident (RSS) and proportional (PSS, shared pages split between processes) memory in MB
+    """
+    memory = {'rss_mb': None, 'pss_mb': None}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Rss:'):
+                    memory['rss_mb'] = int(line.split()[1]) / 1024
+                elif line.startswith('Pss:'):
+                    memory['pss_mb'] = int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        memory['rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return memory
+
+def _model_load_worker(model_path, students, barrier, results):
+    """
+    Load a model in a fresh process, score a batch, then report load time and memory
+    """
+    predictor = StudentPerformancePredictor()
+    start = time.perf_counter()
+    predictor.load_model(model_path)
+    load_seconds = time.perf_counter() - start
+    predictor.batch_predict(students)
+    
+    # Measure while every worker holds its model, so shared pages show up in PSS
+    barrier.wait()
+    report = {'load_ms': load_seconds * 1000}
+    report.update(process_memory_mb())
+    results.put(report)
+    barrier.wait()
+
+def benchmark_model_loading(model, scaler, n_workers=4, n_students=2000):
+    """
+    Compare load time and per-worker memory of the joblib file and the mmap artifact
+    """
+    students = sample_students(n_students)
+    saver = StudentPerformancePredictor(model=model, scaler=scaler)
+    context = multiprocessing.get_context('spawn')
+    report = {}
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {
+            'joblib': os.path.join(tmpdir, 'model.pkl'),
+            'mmap': os.path.join(tmpdir, 'model_artifact')
+        }
+        for artifact_format, path in paths.items():
+            saver.save_model(path, artifact_format=artifact_format)
+        
+        for artifact_format, path in paths.items():
+            barrier = context.Barrier(n_workers)
+            results = context.Queue()
+            workers = [
+                context.Process(target=_model_load_worker, args=(path, students, barrier, results))
+                for _ in range(n_workers)
+            ]
+            for worker in workers:
+                worker.start()
+            worker_reports = [results.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+            
+            report[artifact_format] = {
+                'mean_load_ms': float(np.mean([r['load_ms'] for r in worker_reports])),
+                'mean_rss_mb': float(np.mean([r['rss_mb'] for r in worker_reports])),
+                'mean_pss_mb': float(np.mean([r['pss_mb'] for r in worker_reports if r['pss_mb'] is not None] or [np.nan]))
+            }
+    
+    print(f"\nModel loading across {n_workers} worker processes")
+    for artifact_format, stats in report.items():
+        print(f"{artifact_format}: load {stats['mean_load_ms']:.1f} ms, "
+              f"RSS {stats['mean_rss_mb']:.1f} MB, PSS {stats['mean_pss_mb']:.1f} MB per worker")
+    
+    return report
+
+def benchmark_tree_engine(model, scaler, batch_sizes=(1, 8, 16, 64, 256, 512, 4096, 1000000), max_rows=1000000):
+    """
+    Compare the flattened tree engine against the model's native predict_proba per batch size
+    
+    report['crossover'] is the largest batch size at which the engine is
+    still faster, the value behind prediction_engine.TREE_ENGINE_MAX_ROWS.
+    """
+    engine = FlatTreeEnsemble.from_model(model)
+    if engine is None:
+        raise ValueError(f"{type(model).__name__} cannot be flattened")
+    
+    predictor = StudentPerformancePredictor(scaler=scaler)
+    raw = load_and_preprocess_data(n_samples=min(max(batch_sizes), max_rows), random_state=0)
+    X = predictor.preprocess_input(raw)
+    
+    report = {}
+    print(f"\nTree engine vs native predict_proba ({type(model).__name__}, {engine.n_estimators} trees)")
+    for batch_size in batch_sizes:
+        X_batch = X[:batch_size]
+        # Repeat small batches so each measurement covers a similar amount of work
+        repeats = max(1, min(200, 20000 // batch_size))
+        
+        start = time.perf_counter()
+        for _ in range(repeats):
+            expected = model.predict_proba(X_batch)
+        native_seconds = (time.perf_counter() - start) / repeats
+        
+        start = time.perf_counter()
+        for _ in range(repeats):
+            actual = engine.predict_proba(X_batch)
+        engine_seconds = (time.perf_counter() - start) / repeats
+        
+        report[batch_size] = {
+            'native_ms': native_seconds * 1000,
+            'engine_ms': engine_seconds * 1000,
+            'speedup': native_seconds / engine_seconds,
+            'max_probability_diff': float(np.abs(expected - actual).max())
+        }
+        stats = report[batch_size]
+        print(f"batch {batch_size:>7}: native {stats['native_ms']:.3f} ms, engine {stats['engine_ms']:.3f} ms "
+              f"({stats['speedup']:.1f}x), max diff {stats['max_probability_diff']:.1e}")
+    
+    faster = [batch_size for batch_size in batch_sizes if report[batch_size]['speedup'] >= 1.0]
+    report['crossover'] = max(faster) if faster else 0
+    print(f"Engine is faster up to batch {report['crossover']} ({engine.kind}: "
+          f"TREE_ENGINE_MAX_ROWS = {TREE_ENGINE_MAX_ROWS[engine.kind]})")
+    
+    return report
+
+def benchmark_svm_modes(train_sizes=(2000, 10000, 20000, 100000), n_test=5000, exact_max_rows=20000):
+    """
+    Compare accuracy and training time of the exact SVC and the kernel-approximation SVM per training size
+    
+    The exact SVC is skipped above exact_max_rows, where it becomes too slow
+    to be worth waiting for.
+    """
+    from sklearn.preprocessing import StandardScaler
+    from data_preprocessing import FEATURE_COLUMNS
+    raw = encode_categorical_features(load_and_preprocess_data(n_samples=max(train_sizes) + n_test, random_state=0))
+    X = raw[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    y = raw['performance'].to_numpy()
+    X_test, y_test = X[-n_test:], y[-n_test:]
+    
+    report = {}
+    print("\nExact SVC vs kernel-approximation SVM")
+    for n_rows in train_sizes:
+        scaler = StandardScaler().fit(X[:n_rows])
+        X_train, X_eval = scaler.transform(X[:n_rows]), scaler.transform(X_test)
+        report[n_rows] = {}
+        for mode in ('exact', 'approximate'):
+            if mode == 'exact' and n_rows > exact_max_rows:
+                continue
+            start = time.perf_counter()
+            model = train_svm(X_train, y[:n_rows], mode=mode)
+            fit_seconds = time.perf_counter() - start
+            probability = model.predict_proba(X_eval)[:, 1]
+            report[n_rows][mode] = {
+                'fit_seconds': fit_seconds,
+                'accuracy': float(np.mean(model.predict(X_eval) == y_test)),
+                'brier_score': float(np.mean((probability - y_test) ** 2))
+            }
+            stats = report[n_rows][mode]
+            print(f"{n_rows:>7} rows, {mode:>11}: fit {stats['fit_seconds']:.2f}s, "
+                  f"accuracy {stats['accuracy']:.3f}, Brier {stats['brier_score']:.4f}")
+    
+    return report
+
+def benchmark_knn_index(n_train=200000, n_queries=2000, n_neighbors=5, n_probes=(1, 2, 4, 8, 16, 32)):
+    """
+    Recall and batch query latency of the KNN indexes against brute-force search
+    
+    Recall is the share of the true n_neighbors nearest training rows that
+    an index returns, averaged over the queries.
+    """
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.preprocessing import StandardScaler
+    from data_preprocessing import FEATURE_COLUMNS
+    raw = encode_categorical_features(load_and_preprocess_data(n_samples=n_train + n_queries, random_state=0))
+    X = StandardScaler().fit_transform(raw[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+    y = raw['performance'].to_numpy()
+    X_train, y_train, X_query = X[:n_train], y[:n_train], X[n_train:]
+    
+    brute = NearestNeighbors(n_neighbors=n_neighbors, algorithm='brute').fit(X_train)
+    start = time.perf_counter()
+    _, true_indices = brute.kneighbors(X_query)
+    brute_ms = (time.perf_counter() - start) * 1000
+    
+    def measure(model):
+        start = time.perf_counter()
+        _, indices = model.kneighbors(X_query)
+        latency_ms = (time.perf_counter() - start) * 1000
+        # Exact distance ties can swap which equally near row is returned, so compare sets of rows
+        recall = np.mean([len(np.intersect1d(found, true)) / n_neighbors
+                          for found, true in zip(indices, true_indices)])
+        return {'batch_ms': latency_ms, 'per_query_us': latency_ms * 1000 / n_queries, 'recall': float(recall)}
+    
+    report = {'brute': {'batch_ms': brute_ms, 'per_query_us': brute_ms * 1000 / n_queries, 'recall': 1.0}}
+    start = time.perf_counter()
+    kd_tree = IndexedKNNClassifier(n_neighbors, index='kd_tree').fit(X_train, y_train)
+    print(f"\nKNN index vs brute force ({n_train} training rows, {n_queries} queries); "
+          f"KD-tree built in {time.perf_counter() - start:.2f}s")
+    report['kd_tree'] = measure(kd_tree)
+    
+    start = time.perf_counter()
+    ivf = IndexedKNNClassifier(n_neighbors, index='ivf').fit(X_train, y_train)
+    print(f"IVF index ({len(ivf.index_.centroids)} cells) built in {time.perf_counter() - start:.2f}s")
+    for n_probe in n_probes:
+        ivf.n_probe = n_probe
+        report[f'ivf_probe_{n_probe}'] = measure(ivf)
+    
+    for name, stats in report.items():
+        print(f"{name:>13}: {stats['batch_ms']:8.1f} ms per batch, {stats['per_query_us']:7.1f} us per query, "
+              f"recall {stats['recall']:.3f}")
+    
+    return report
+
+def _preprocessing_footprint(n_students, compact):
+    """
+    Bytes held at each preprocessing stage, plus the traced peak of the whole pipeline
+    """
+    import tracemalloc
+    from sklearn.preprocessing import StandardScaler
+    from data_preprocessing import FEATURE_COLUMNS
+    tracemalloc.start()
+    raw = load_and_preprocess_data(n_samples=n_students, random_state=0, compact=compact)
+    encoded = encode_categorical_features(raw, compact=compact)
+    X = encoded[FEATURE_COLUMNS].to_numpy(dtype=np.float32 if compact else np.float64)
+    scaled = StandardScaler(copy=not compact).fit_transform(X)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'raw': raw.memory_usage(deep=True).sum() / n_students,
+        'encoded': encoded.memory_usage(deep=True).sum() / n_students,
+        # In-place scaling leaves a single matrix; otherwise both X and its scaled copy exist
+        'matrices': (scaled.nbytes + (0 if np.shares_memory(X, scaled) else X.nbytes)) / n_students,
+        'peak': peak / n_students
+    }
+
+def benchmark_compact_data_path(n_students=200000):
+    """
+    Bytes per student through preprocessing with default and compact dtypes, plus an accuracy parity check
+    
+    Parity trains every model on the default and the compact preprocessing
+    outputs of the same data and compares their test accuracy.
+    """
+    from model_training import MODEL_TRAINERS
+    report = {'bytes_per_student': {}, 'accuracy': {}}
+    for compact in (False, True):
+        report['bytes_per_student']['compact' if compact else 'default'] = _preprocessing_footprint(n_students, compact)
+    
+    print(f"\nBytes per student ({n_students} students)")
+    for stage in ['raw', 'encoded', 'matrices', 'peak']:
+        default = report['bytes_per_student']['default'][stage]
+        compact = report['bytes_per_student']['compact'][stage]
+        print(f"{stage:>9}: {default:7.1f} -> {compact:6.1f} ({default / compact:.1f}x smaller)")
+    
+    data = {compact: preprocess_data(use_cache=False, compact=compact) for compact in (False, True)}
+    for model_name, train_func in MODEL_TRAINERS.items():
+        accuracy = {}
+        for compact, split in data.items():
+            model = train_func(split['X_train'], split['y_train'])
+            accuracy['compact' if compact else 'default'] = float(np.mean(model.predict(split['X_test']) ==
+                                                                        np.asarray(split['y_test'])))
+        report['accuracy'][model_name] = accuracy
+        print(f"{model_name}: accuracy {accuracy['default']:.3f} default, {accuracy['compact']:.3f} compact")
+    report['max_accuracy_diff'] = max(abs(a['default'] - a['compact']) for a in report['accuracy'].values())
+    print(f"Max accuracy difference: {report['max_accuracy_diff']:.3f}")
+    
+    return report
+
+def main():
+    """
+    Run the prediction benchmarks
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the student performance prediction path')
+    parser.add_argument('--imports-only', action='store_true',
+                        help='Only run the cold import time check (exits non-zero on regression)')
+    args = parser.parse_args()
+    
+    benchmark_import_time()
+    if args.imports_only:
+        return
+    
+    predictor = build_predictor()
+    benchmark_batch_predict(predictor)
+    benchmark_single_predict(predictor)
+    benchmark_instrumentation_overhead(predictor)
+    benchmark_cold_start(predictor)
+    benchmark_explanations(predictor)
+    
+    data = preprocess_data()
+    forest = RandomForestClassifier(n_estimators=500, random_state=42).fit(data['X_train'], data['y_train'])
+    benchmark_model_loading(forest, data['scaler'])
+    
+    benchmark_tree_engine(train_random_forest(data['X_train'], data['y_train']), data['scaler'])
+    benchmark_tree_engine(train_xgboost(data['X_train'], data['y_train']), data['scaler'])
+    benchmark_explanations(build_predictor(train_xgboost))
+    benchmark_svm_modes()
+    benchmark_knn_index()
+    benchmark_compact_data_path()
+
+if __name__ == "__main__":
+    main()
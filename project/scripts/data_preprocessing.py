@@ -1,29 +1,59 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.model_selection import train_test_split
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-def load_and_preprocess_data():
+# Only pandas and NumPy are imported at module level: the prediction path
+# imports this module for the encoding tables, so training libraries are
+# imported inside the functions that use them.
+
+FEATURE_COLUMNS = [
+    'attendance_rate', 'study_hours_per_week', 'sleep_duration',
+    'health_status', 'family_support', 'internet_access',
+    'parental_education', 'previous_performance', 'class_participation',
+    'extracurricular_activities'
+]
+
+# Label encoding for ordinal features
+ORDINAL_MAPPINGS = {
+    'health_status': {'poor': 0, 'fair': 1, 'good': 2, 'excellent': 3},
+    'family_support': {'low': 0, 'medium': 1, 'high': 2},
+    'parental_education': {'primary': 0, 'secondary': 1, 'higher': 2},
+    'class_participation': {'low': 0, 'medium': 1, 'high': 2},
+    'extracurricular_activities': {'none': 0, 'low': 1, 'medium': 2, 'high': 3}
+}
+
+# Binary features encoded as 1 when equal to the given value
+BINARY_FEATURES = {
+    'internet_access': 'yes'
+}
+
+def load_and_preprocess_data(n_samples=1000, random_state=42, compact=False):
     """
     Load and preprocess student performance data
+    
+    With compact=True the same records come back with compact dtypes (see to_compact_dtypes).
     """
     # Generate sample data (in real scenario, load from CSV or database)
-    np.random.seed(42)
-    n_samples = 1000
+    np.random.seed(random_state)
+    
+    def choice(options, n_samples, p):
+        # Drawing indices consumes the generator exactly like drawing the strings,
+        # so compact mode yields the same students without building string arrays
+        codes = np.random.choice(len(options), n_samples, p=p)
+        if compact:
+            return pd.Categorical.from_codes(codes.astype(np.int8), categories=options)
+        return np.asarray(options)[codes]
     
     data = {
         'attendance_rate': np.random.normal(80, 15, n_samples).clip(0, 100),
         'study_hours_per_week': np.random.exponential(12, n_samples).clip(0, 40),
         'sleep_duration': np.random.normal(7, 1.5, n_samples).clip(4, 12),
-        'health_status': np.random.choice(['excellent', 'good', 'fair', 'poor'], n_samples, p=[0.2, 0.4, 0.3, 0.1]),
-        'family_support': np.random.choice(['high', 'medium', 'low'], n_samples, p=[0.4, 0.4, 0.2]),
-        'internet_access': np.random.choice(['yes', 'no'], n_samples, p=[0.85, 0.15]),
-        'parental_education': np.random.choice(['primary', 'secondary', 'higher'], n_samples, p=[0.2, 0.5, 0.3]),
+        'health_status': choice(['excellent', 'good', 'fair', 'poor'], n_samples, p=[0.2, 0.4, 0.3, 0.1]),
+        'family_support': choice(['high', 'medium', 'low'], n_samples, p=[0.4, 0.4, 0.2]),
+        'internet_access': choice(['yes', 'no'], n_samples, p=[0.85, 0.15]),
+        'parental_education': choice(['primary', 'secondary', 'higher'], n_samples, p=[0.2, 0.5, 0.3]),
         'previous_performance': np.random.normal(2.8, 0.8, n_samples).clip(0, 4),
-        'class_participation': np.random.choice(['high', 'medium', 'low'], n_samples, p=[0.3, 0.5, 0.2]),
-        'extracurricular_activities': np.random.choice(['high', 'medium', 'low', 'none'], n_samples, p=[0.2, 0.3, 0.3, 0.2])
+        'class_participation': choice(['high', 'medium', 'low'], n_samples, p=[0.3, 0.5, 0.2]),
+        'extracurricular_activities': choice(['high', 'medium', 'low', 'none'], n_samples, p=[0.2, 0.3, 0.3, 0.2])
     }
     
     df = pd.DataFrame(data)
@@ -44,28 +74,46 @@ def load_and_preprocess_data():
     # Convert to pass/fail based on threshold
     df['performance'] = (performance_score > performance_score.median()).astype(int)
     
+    if compact:
+        df = to_compact_dtypes(df)
     return df
 
-def encode_categorical_features(df):
+def to_compact_dtypes(df):
+    """
+    float32 numeric columns, categorical string columns and an int8 target
+    """
+    df = df.copy(deep=False)
+    for column in df.columns:
+        if column in ORDINAL_MAPPINGS:
+            df[column] = pd.Categorical(df[column], categories=list(ORDINAL_MAPPINGS[column]))
+        elif column in BINARY_FEATURES or df[column].dtype == object or pd.api.types.is_string_dtype(df[column]):
+            df[column] = df[column].astype('category')
+        elif column == 'performance':
+            df[column] = df[column].astype(np.int8)
+        elif pd.api.types.is_float_dtype(df[column]):
+            df[column] = df[column].astype(np.float32)
+    return df
+
+def encode_categorical_features(df, compact=False):
     """
     Encode categorical features for machine learning
+    
+    With compact=True the encoded columns are int8 (float32 where unknown
+    categories leave NaN) and the untouched columns are shared with df
+    instead of copied.
     """
-    df_encoded = df.copy()
+    df_encoded = df.copy(deep=not compact)
     
     # Label encoding for ordinal features
-    ordinal_mappings = {
-        'health_status': {'poor': 0, 'fair': 1, 'good': 2, 'excellent': 3},
-        'family_support': {'low': 0, 'medium': 1, 'high': 2},
-        'parental_education': {'primary': 0, 'secondary': 1, 'higher': 2},
-        'class_participation': {'low': 0, 'medium': 1, 'high': 2},
-        'extracurricular_activities': {'none': 0, 'low': 1, 'medium': 2, 'high': 3}
-    }
-    
-    for feature, mapping in ordinal_mappings.items():
-        df_encoded[feature] = df_encoded[feature].map(mapping)
+    for feature, mapping in ORDINAL_MAPPINGS.items():
+        encoded = df_encoded[feature].map(mapping)
+        if compact:
+            encoded = encoded.astype(np.float32 if encoded.isna().any() else np.int8)
+        df_encoded[feature] = encoded
     
     # Binary encoding
-    df_encoded['internet_access'] = (df_encoded['internet_access'] == 'yes').astype(int)
+    for feature, positive_value in BINARY_FEATURES.items():
+        df_encoded[feature] = (df_encoded[feature] == positive_value).astype(np.int8 if compact else int)
     
     return df_encoded
 
@@ -73,28 +121,57 @@ def prepare_features_and_target(df):
     """
     Prepare features and target for machine learning
     """
-    feature_columns = [
-        'attendance_rate', 'study_hours_per_week', 'sleep_duration',
-        'health_status', 'family_support', 'internet_access',
-        'parental_education', 'previous_performance', 'class_participation',
-        'extracurricular_activities'
-    ]
-    
-    X = df[feature_columns]
+    X = df[FEATURE_COLUMNS]
     y = df['performance']
     
     return X, y
 
-def main():
+def preprocessing_params(test_size=0.2, random_state=42, compact=False):
+    """
+    Everything besides the raw data that determines the preprocessing outputs
+    """
+    return {
+        'compact': compact,
+        'test_size': test_size,
+        'random_state': random_state,
+        'stratify': 'performance',
+        'feature_columns': FEATURE_COLUMNS,
+        'ordinal_mappings': ORDINAL_MAPPINGS,
+        'binary_features': BINARY_FEATURES,
+        'scaler': 'StandardScaler'
+    }
+
+def main(use_cache=True, cache_dir=None, compact=False):
     """
     Main preprocessing pipeline
+    
+    Results are cached on disk under a hash of the raw data and the
+    preprocessing parameters, so repeated runs skip encoding, splitting
+    and scaler fitting.
+    
+    compact=True keeps the data in compact dtypes throughout: categorical
+    and int8 columns, float32 features scaled in place, so the scaled
+    matrices take half the memory of the float64 ones.
     """
     print("Loading and preprocessing student data...")
     
     # Load data
-    df = load_and_preprocess_data()
+    df = load_and_preprocess_data(compact=compact)
     print(f"Loaded {len(df)} student records")
     
+    cache = None
+    if use_cache:
+        from preprocessing_cache import PreprocessingCache, preprocessing_key
+        cache = PreprocessingCache(cache_dir)
+        cache_key = preprocessing_key(df, preprocessing_params(compact=compact))
+        cached = cache.get(cache_key)
+        if cached is not None:
+            print(f"Using cached preprocessing results ({cache_key[:12]})")
+            return cached
+    
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    
     # Display basic statistics
     print("\nDataset Info:")
     print(df.info())
@@ -102,10 +179,13 @@ def main():
     print(df['performance'].value_counts())
     
     # Encode categorical features
-    df_encoded = encode_categorical_features(df)
+    df_encoded = encode_categorical_features(df, compact=compact)
     
     # Prepare features and target
     X, y = prepare_features_and_target(df_encoded)
+    feature_names = X.columns.tolist()
+    if compact:
+        X = X.to_numpy(dtype=np.float32)
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
@@ -113,9 +193,19 @@ def main():
     )
     
     # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    if compact:
+        # The split made private float32 copies, so scale them in place
+        scaler = StandardScaler(copy=False)
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        # Callers of the saved scaler must not have their inputs overwritten
+        scaler.set_params(copy=True)
+        # Fitted on a bare array, so record the columns that serving passes by name
+        scaler.feature_names_in_ = np.asarray(feature_names, dtype=object)
+    else:
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
     
     print(f"\nTraining set size: {len(X_train)}")
     print(f"Test set size: {len(X_test)}")
@@ -126,10 +216,14 @@ def main():
         'X_test': X_test_scaled,
         'y_train': y_train,
         'y_test': y_test,
-        'feature_names': X.columns.tolist(),
-        'scaler': scaler
+        'feature_names': feature_names,
+        'scaler': scaler,
+        'df_encoded': df_encoded
     }
     
+    if cache is not None:
+        cache.put(cache_key, processed_data)
+    
     print("Data preprocessing completed successfully!")
     return processed_data
 
@@ -0,0 +1,207 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from data_preprocessing import FEATURE_COLUMNS, load_and_preprocess_data, encode_categorical_features
+from prediction_engine import StudentPerformancePredictor
+
+# Candidate students from smallest to largest; distill() keeps the first one
+# whose accuracy is within the allowed drop of the teacher's
+STUDENT_LADDER = {
+    'tree': [
+        {'max_depth': 2, 'n_estimators': 10},
+        {'max_depth': 2, 'n_estimators': 30},
+        {'max_depth': 3, 'n_estimators': 50},
+        {'max_depth': 4, 'n_estimators': 100}
+    ],
+    'linear': [
+        {'C': 1.0}
+    ]
+}
+
+def rescale(X, data_scaler, scaler, feature_names=FEATURE_COLUMNS):
+    """
+    Re-express rows scaled by data_scaler in scaler's space, e.g. a teacher trained elsewhere
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if scaler is data_scaler:
+        return X
+    if data_scaler is not None:
+        X = data_scaler.inverse_transform(X)
+    if scaler is None:
+        return X
+    return scaler.transform(pd.DataFrame(X, columns=feature_names))
+
+def build_transfer_set(data, scaler, n_synthetic=20000, random_state=1):
+    """
+    Rows the teacher labels for the student, in scaler's space: the training rows plus fresh unlabelled students
+    """
+    X = [rescale(data['X_train'], data['scaler'], scaler, data['feature_names'])]
+    if n_synthetic:
+        raw = encode_categorical_features(load_and_preprocess_data(n_samples=n_synthetic, random_state=random_state))
+        X.append(scaler.transform(raw[FEATURE_COLUMNS]) if scaler is not None else raw[FEATURE_COLUMNS].to_numpy())
+    return np.vstack(X)
+
+def teacher_probabilities(teacher, X):
+    """
+    Teacher's probability of the positive class, the student's soft target
+    """
+    return teacher.predict_proba(X)[:, 1]
+
+def fit_tree_student(X, soft_targets, max_depth=3, n_estimators=50, learning_rate=0.3, n_jobs=None):
+    """
+    Small boosted tree ensemble fitted to soft targets with the logistic loss
+    
+    binary:logistic accepts targets anywhere in [0, 1], so the student
+    matches the teacher's probabilities rather than its hard labels.
+    """
+    import xgboost as xgb
+    from model_training import classifier_from_booster
+    params = {'objective': 'binary:logistic', 'max_depth': max_depth, 'learning_rate': learning_rate,
+              'tree_method': 'hist', 'seed': 42}
+    if n_jobs:
+        params['nthread'] = n_jobs
+    booster = xgb.train(params, xgb.DMatrix(X, label=soft_targets), num_boost_round=n_estimators)
+    return classifier_from_booster(booster)
+
+def fit_linear_student(X, soft_targets, C=1.0):
+    """
+    Logistic regression fitted to soft targets
+    
+    Every row appears once as each class, weighted by the teacher's
+    probability of that class; the weighted log loss equals the
+    cross-entropy against the soft targets.
+    """
+    from sklearn.linear_model import LogisticRegression
+    model = LogisticRegression(C=C, max_iter=1000, random_state=42)
+    model.fit(np.vstack([X, X]), np.r_[np.zeros(len(X), dtype=int), np.ones(len(X), dtype=int)],
+              sample_weight=np.r_[1.0 - soft_targets, soft_targets])
+    return model
+
+STUDENT_TRAINERS = {
+    'tree': fit_tree_student,
+    'linear': fit_linear_student
+}
+
+def _artifact_bytes(predictor):
+    import joblib
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.joblib')
+        joblib.dump({'model': predictor.model, 'scaler': predictor.scaler, 'feature_names': predictor.feature_names},
+                    path)
+        return os.path.getsize(path)
+
+def measure_model(predictor, X_test, y_test, students, batch_repeats=20):
+    """
+    Artifact size, single-student predict latency, batch scoring throughput and test accuracy
+    """
+    timings = []
+    for student in students:
+        start = time.perf_counter()
+        predictor.predict(student)
+        timings.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    for _ in range(batch_repeats):
+        predictor.model.predict_proba(X_test)
+    batch_seconds = (time.perf_counter() - start) / batch_repeats
+    
+    return {
+        'artifact_bytes': _artifact_bytes(predictor),
+        'predict_p50_us': float(np.percentile(timings, 50) * 1e6),
+        'predict_p99_us': float(np.percentile(timings, 99) * 1e6),
+        'batch_rows_per_second': len(X_test) / batch_seconds,
+        'accuracy': float(np.mean(predictor.model.predict(X_test) == np.asarray(y_test)))
+    }
+
+def distill(teacher_predictor, data, student_type='tree', max_accuracy_drop=0.01, n_synthetic=20000,
+            n_latency_calls=500):
+    """
+    Distill a trained predictor into the smallest student within max_accuracy_drop of its test accuracy
+    
+    Students from STUDENT_LADDER[student_type] are fitted to the teacher's
+    soft probabilities on the transfer set in order of size. A candidate
+    only qualifies if it is also smaller and faster per predict than the
+    teacher. Returns the chosen student as a StudentPerformancePredictor
+    sharing the teacher's scaler, so it is a drop-in replacement, and a
+    report comparing teacher and student. If no candidate qualifies the
+    largest one is returned with report['within_budget'] False.
+    """
+    teacher = teacher_predictor.model
+    if len(getattr(teacher, 'classes_', [])) != 2:
+        raise ValueError("Distillation supports binary classifiers only")
+    # Everything the student sees is scaled the way it will be served, with the teacher's scaler
+    X_test = rescale(data['X_test'], data['scaler'], teacher_predictor.scaler, data['feature_names'])
+    y_test = np.asarray(data['y_test'])
+    students = load_and_preprocess_data(n_samples=n_latency_calls, random_state=2).drop(columns='performance')
+    students = students.to_dict('records')
+    
+    X_transfer = build_transfer_set(data, teacher_predictor.scaler, n_synthetic)
+    soft_targets = teacher_probabilities(teacher, X_transfer)
+    teacher_stats = measure_model(teacher_predictor, X_test, y_test, students)
+    print(f"Teacher {type(teacher).__name__}: accuracy {teacher_stats['accuracy']:.3f}, "
+          f"{teacher_stats['artifact_bytes'] / 1024:.0f} KB, predict p50 {teacher_stats['predict_p50_us']:.0f} us")
+    
+    candidates = []
+    for params in STUDENT_LADDER[student_type]:
+        start = time.perf_counter()
+        student = StudentPerformancePredictor(model=STUDENT_TRAINERS[student_type](X_transfer, soft_targets, **params),
+                                              scaler=teacher_predictor.scaler)
+        student.feature_names = list(teacher_predictor.feature_names)
+        stats = measure_model(student, X_test, y_test, students)
+        stats['params'] = params
+        stats['fit_seconds'] = time.perf_counter() - start
+        stats['agreement'] = float(np.mean(student.model.predict(X_test) == teacher.predict(X_test)))
+        stats['accuracy_drop'] = teacher_stats['accuracy'] - stats['accuracy']
+        # A student that is not smaller and faster is no improvement, however accurate
+        stats['qualifies'] = (stats['accuracy_drop'] <= max_accuracy_drop and
+                              stats['artifact_bytes'] < teacher_stats['artifact_bytes'] and
+                              stats['predict_p50_us'] < teacher_stats['predict_p50_us'])
+        candidates.append((student, stats))
+        print(f"Student {params}: accuracy {stats['accuracy']:.3f} (drop {stats['accuracy_drop']:+.3f}), "
+              f"agreement {stats['agreement']:.3f}, {stats['artifact_bytes'] / 1024:.0f} KB, "
+              f"predict p50 {stats['predict_p50_us']:.0f} us")
+        if stats['qualifies']:
+            break
+    
+    student, student_stats = candidates[-1]
+    report = {
+        'teacher_type': type(teacher).__name__,
+        'student_type': student_type,
+        'teacher': teacher_stats,
+        'student': student_stats,
+        'candidates': [stats for _, stats in candidates],
+        'max_accuracy_drop': max_accuracy_drop,
+        'within_budget': student_stats['qualifies'],
+        'size_ratio': teacher_stats['artifact_bytes'] / student_stats['artifact_bytes'],
+        'latency_ratio': teacher_stats['predict_p50_us'] / student_stats['predict_p50_us']
+    }
+    print(f"Chose student {student_stats['params']}: {report['size_ratio']:.1f}x smaller, "
+          f"{report['latency_ratio']:.1f}x faster per predict, accuracy drop {student_stats['accuracy_drop']:+.3f} "
+          f"({'within' if report['within_budget'] else 'OUTSIDE'} budget {max_accuracy_drop})")
+    return student, report
+
+def main():
+    """
+    Command-line entry point for distilling a saved model
+    """
+    parser = argparse.ArgumentParser(description='Distill a trained model into a compact student model')
+    parser.add_argument('--teacher', required=True, help='Path to a model saved with save_model')
+    parser.add_argument('--output', required=True, help='Where to save the student model')
+    parser.add_argument('--student', choices=list(STUDENT_LADDER), default='tree')
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01)
+    parser.add_argument('--artifact-format', choices=['joblib', 'mmap', 'standalone'], default='joblib')
+    args = parser.parse_args()
+    
+    from data_preprocessing import main as preprocess_data
+    teacher = StudentPerformancePredictor()
+    teacher.load_model(args.teacher)
+    student, report = distill(teacher, preprocess_data(), args.student, args.max_accuracy_drop)
+    if not report['within_budget']:
+        raise SystemExit("No student is within the accuracy budget and smaller and faster; not saving one")
+    student.save_model(args.output, artifact_format=args.artifact_format)
+
+if __name__ == "__main__":
+    main()
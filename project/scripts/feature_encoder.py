@@ -0,0 +1,73 @@
+import numpy as np
+from data_preprocessing import ORDINAL_MAPPINGS, BINARY_FEATURES
+
+class FeatureEncoder:
+    """
+    Precompiled encoder turning a single student dict into a scaled feature row
+    
+    Produces the same values as encode_categorical_features followed by
+    scaler.transform, without building a DataFrame.
+    """
+    
+    def __init__(self, feature_names, scaler=None):
+        self.feature_names = list(feature_names)
+        self.scaler = scaler
+        
+        # One (feature, lookup) pair per column; lookup is None for numeric features
+        self._columns = []
+        for feature in self.feature_names:
+            if feature in ORDINAL_MAPPINGS:
+                lookup = {key: float(value) for key, value in ORDINAL_MAPPINGS[feature].items()}
+            elif feature in BINARY_FEATURES:
+                lookup = {BINARY_FEATURES[feature]: 1.0}
+            else:
+                lookup = None
+            self._columns.append((feature, lookup, feature in BINARY_FEATURES))
+        
+        # Fitted StandardScaler as an affine transform, honouring with_mean/with_std
+        self._mean = None
+        self._scale = None
+        if scaler is not None:
+            if getattr(scaler, 'with_mean', True):
+                self._mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if getattr(scaler, 'with_std', True):
+                self._scale = np.asarray(scaler.scale_, dtype=np.float64)
+    
+    def matches(self, feature_names, scaler):
+        """
+        Check whether this encoder was compiled for the given feature names and scaler
+        """
+        return self.scaler is scaler and self.feature_names == list(feature_names)
+    
+    def encode(self, student_data):
+        """
+        Encode a student dict into a (1, n_features) float64 row without scaling
+        """
+        row = np.empty((1, len(self._columns)), dtype=np.float64)
+        values = row[0]
+        for i, (feature, lookup, is_binary) in enumerate(self._columns):
+            value = student_data[feature]
+            if lookup is None:
+                values[i] = value
+            elif is_binary:
+                values[i] = lookup.get(value, 0.0)
+            else:
+                # Unknown categories become NaN, as Series.map does
+                values[i] = lookup.get(value, np.nan)
+        return row
+    
+    def scale(self, row):
+        """
+        Apply the scaler to an encoded row in place
+        """
+        if self._mean is not None:
+            np.subtract(row, self._mean, out=row)
+        if self._scale is not None:
+            np.divide(row, self._scale, out=row)
+        return row
+    
+    def transform(self, student_data):
+        """
+        Encode a student dict and apply the scaler in place
+        """
+        return self.scale(self.encode(student_data))
@@ -0,0 +1,180 @@
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+# Generated output, kept out of version control; app/api/feature-importance serves it
+# to the analytics dashboard (components/analytics.tsx)
+DEFAULT_IMPORTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                       'feature_importance.json')
+
+_worker_state = {}
+
+def _init_worker(paths):
+    """
+    Memory-map the shared test set once per worker, plus one scratch copy to permute in place
+    """
+    _worker_state['X'] = np.load(paths['X_test'], mmap_mode='r')
+    _worker_state['y'] = np.load(paths['y_test'], mmap_mode='r')
+    _worker_state['X_work'] = np.array(_worker_state['X'])
+    _worker_state['models'] = {}
+
+def _load_model(model_path):
+    import joblib
+    models = _worker_state['models']
+    if model_path not in models:
+        models[model_path] = joblib.load(model_path)
+    return models[model_path]
+
+def _permutation_scores(model, X, X_work, y, feature, n_repeats, random_state):
+    """
+    Accuracy with one column shuffled, n_repeats times, restoring the column afterwards
+    """
+    # Seeded per feature, so results do not depend on which worker runs the task
+    rng = np.random.default_rng([random_state, feature])
+    scores = np.empty(n_repeats)
+    for repeat in range(n_repeats):
+        X_work[:, feature] = X[rng.permutation(len(X)), feature]
+        scores[repeat] = np.mean(model.predict(X_work) == y)
+    X_work[:, feature] = X[:, feature]
+    return scores
+
+def _importance_task(model_name, model_path, feature, n_repeats, random_state):
+    model = _load_model(model_path)
+    scores = _permutation_scores(model, _worker_state['X'], _worker_state['X_work'], _worker_state['y'],
+                                 feature, n_repeats, random_state)
+    return model_name, feature, scores
+
+def permutation_importance(models, X_test, y_test, feature_names, n_repeats=10, n_jobs=None, random_state=42):
+    """
+    Model-agnostic permutation importance (drop in test accuracy) for every model and feature
+    
+    Works for any model with predict(). Each (model, feature) pair is a task
+    in a process pool; the test set is saved once as .npy files that every
+    worker memory-maps, and each model is pickled once and loaded at most
+    once per worker. Returns {model name: {'baseline_score', 'features'}}
+    with features sorted by mean importance.
+    """
+    X_test = np.ascontiguousarray(np.asarray(X_test, dtype=np.float64))
+    y_test = np.asarray(y_test)
+    n_features = X_test.shape[1]
+    n_workers = min(n_jobs or os.cpu_count() or 1, len(models) * n_features)
+    
+    scores = {name: {} for name in models}
+    start = time.perf_counter()
+    if n_workers == 1:
+        # One core gains nothing from worker start-up, so run in process
+        X_work = X_test.copy()
+        for name, model in models.items():
+            for feature in range(n_features):
+                scores[name][feature] = _permutation_scores(model, X_test, X_work, y_test, feature, n_repeats,
+                                                            random_state)
+    else:
+        import joblib
+        from model_training import _share_arrays
+        with tempfile.TemporaryDirectory() as shared_dir:
+            paths = _share_arrays(shared_dir, {'X_test': X_test, 'y_test': y_test})
+            model_paths = {}
+            for i, (name, model) in enumerate(models.items()):
+                model_paths[name] = os.path.join(shared_dir, f'model_{i}.joblib')
+                joblib.dump(model, model_paths[name])
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(paths,)) as pool:
+                futures = [pool.submit(_importance_task, name, model_paths[name], feature, n_repeats, random_state)
+                           for name in models for feature in range(n_features)]
+                for future in as_completed(futures):
+                    name, feature, feature_scores = future.result()
+                    scores[name][feature] = feature_scores
+    
+    results = {}
+    for name, model in models.items():
+        baseline = float(np.mean(model.predict(X_test) == y_test))
+        features = []
+        for feature in range(n_features):
+            drops = baseline - scores[name][feature]
+            features.append({'feature': feature_names[feature], 'importance_mean': float(drops.mean()),
+                             'importance_std': float(drops.std())})
+        results[name] = {'baseline_score': baseline,
+                         'features': sorted(features, key=lambda item: -item['importance_mean'])}
+    print(f"Permutation importance for {len(models)} models x {n_features} features x {n_repeats} repeats "
+          f"in {time.perf_counter() - start:.1f}s ({n_workers} workers)")
+    return results
+
+def write_importance(results, path=DEFAULT_IMPORTANCE_PATH, n_repeats=None, n_rows=None):
+    """
+    Write importance results as JSON, or as a flat Parquet table if path ends in .parquet
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith('.parquet'):
+        rows = [{'model_name': name, 'baseline_score': result['baseline_score'], **feature}
+                for name, result in results.items() for feature in result['features']]
+        pd.DataFrame(rows).to_parquet(path + '.tmp', index=False)
+    else:
+        document = {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'metric': 'accuracy',
+            'n_repeats': n_repeats,
+            'n_test_rows': n_rows,
+            'models': results
+        }
+        with open(path + '.tmp', 'w') as f:
+            json.dump(document, f, indent=2)
+    os.replace(path + '.tmp', path)
+    print(f"Feature importance written to {path}")
+
+def load_importance(path=DEFAULT_IMPORTANCE_PATH):
+    """
+    {model name: result} from a file written by write_importance
+    """
+    if path.endswith('.parquet'):
+        table = pd.read_parquet(path)
+        return {
+            name: {'baseline_score': float(group['baseline_score'].iloc[0]),
+                   'features': group.drop(columns=['model_name', 'baseline_score']).to_dict('records')}
+            for name, group in table.groupby('model_name', sort=False)
+        }
+    with open(path) as f:
+        return json.load(f)['models']
+
+def plot_importance(results, output_dir):
+    """
+    Render one bar chart per model to PNG files; an optional step after the importance is written
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, result in results.items():
+        features = result['features'][::-1]
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh([item['feature'] for item in features], [item['importance_mean'] for item in features],
+                xerr=[item['importance_std'] for item in features], color='steelblue')
+        ax.set_title(f'Permutation Importance - {name}')
+        ax.set_xlabel('Drop in accuracy')
+        fig.tight_layout()
+        paths.append(os.path.join(output_dir, f"{name.lower().replace(' ', '_')}_importance.png"))
+        fig.savefig(paths[-1])
+        plt.close(fig)
+    return paths
+
+def main():
+    """
+    Command-line entry point for rendering saved importance results
+    """
+    parser = argparse.ArgumentParser(description='Plot permutation importance written by model training')
+    parser.add_argument('--input', default=DEFAULT_IMPORTANCE_PATH)
+    parser.add_argument('--output-dir', default='importance_plots')
+    args = parser.parse_args()
+    
+    for path in plot_importance(load_importance(args.input), args.output_dir):
+        print(f"Saved {path}")
+
+if __name__ == "__main__":
+    main()
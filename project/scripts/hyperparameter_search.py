@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from model_training import MODEL_TRAINERS, _share_arrays
+
+DEFAULT_RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'hyperparameter_trials.jsonl')
+
+# Candidate values per hyperparameter, sampled without replacement from the full grid
+SEARCH_SPACES = {
+    'Logistic Regression': {
+        'C': [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0]
+    },
+    'Random Forest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [None, 6, 10, 16],
+        'min_samples_leaf': [1, 2, 5],
+        'max_features': ['sqrt', 0.5, 1.0]
+    },
+    'Support Vector Machine': {
+        'C': [0.1, 0.3, 1.0, 3.0, 10.0],
+        'gamma': ['scale', 0.01, 0.03, 0.1]
+    },
+    'K-Nearest Neighbors': {
+        'n_neighbors': [3, 5, 9, 15, 25, 41],
+        'weights': ['uniform', 'distance']
+    },
+    'XGBoost': {
+        'max_depth': [2, 3, 4, 6],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 1.0],
+        'colsample_bytree': [0.7, 1.0],
+        'min_child_weight': [1, 5]
+    }
+}
+
+# Budget each rung spends per candidate: a share of the training rows, or
+# boosting rounds for XGBoost (which also stops early on the validation set)
+RESOURCES = {
+    'XGBoost': {'name': 'n_estimators', 'min': 50, 'max': 1350}
+}
+DEFAULT_RESOURCE = {'name': 'samples', 'min': 0.11, 'max': 1.0}
+EARLY_STOPPING_ROUNDS = 20
+
+def sample_candidates(space, n_candidates, random_state=0):
+    """
+    Deterministically sample up to n_candidates configurations from a grid
+    """
+    names = sorted(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    random.Random(random_state).shuffle(grid)
+    return grid[:n_candidates]
+
+def config_id(params):
+    """
+    Stable short ID of a hyperparameter configuration
+    """
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+def search_key(arrays, settings):
+    """
+    Hash of the training and validation arrays plus the search settings
+    
+    Trials are only resumed under the same key, so a results file left over
+    from other data, another split or other settings is never reused.
+    """
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f'{name}:{array.dtype.str}:{array.shape}'.encode('utf-8'))
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+def load_trials(results_path, key=None):
+    """
+    Finished trials from a JSON Lines results file, keyed by (model, config ID, resource)
+    
+    With key set, trials recorded under a different search_key() are ignored.
+    """
+    trials = {}
+    if results_path and os.path.exists(results_path):
+        with open(results_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    trial = json.loads(line)
+                except ValueError:
+                    # A line cut off by an interruption is simply re-run
+                    continue
+                if key is not None and trial.get('search_key') != key:
+                    continue
+                trials[(trial['model_name'], trial['config_id'], trial['resource'])] = trial
+    return trials
+
+def _run_trial(model_name, params, resource_name, resource, paths, n_threads):
+    """
+    Fit one configuration on its rung budget and score it on the validation split
+    """
+    from threadpoolctl import threadpool_limits
+    arrays = {name: np.load(path, mmap_mode='c') for name, path in paths.items()}
+    X_train, y_train = arrays['X_train'], arrays['y_train']
+    X_val, y_val = arrays['X_val'], arrays['y_val']
+    
+    train_params = dict(params)
+    if resource_name == 'samples':
+        # Rows are pre-shuffled, so every prefix is a random subset and rungs are nested
+        n_rows = max(2, int(round(len(X_train) * resource)))
+        X_train, y_train = X_train[:n_rows], y_train[:n_rows]
+    else:
+        train_params[resource_name] = int(resource)
+    if model_name == 'XGBoost':
+        train_params['early_stopping_rounds'] = EARLY_STOPPING_ROUNDS
+        train_params['eval_set'] = [(X_val, y_val)]
+    
+    start = time.perf_counter()
+    with threadpool_limits(limits=n_threads):
+        model = MODEL_TRAINERS[model_name](X_train, y_train, n_jobs=n_threads, **train_params)
+        score = float(np.mean(model.predict(X_val) == y_val))
+    
+    best_iteration = getattr(model, 'best_iteration', None) if model_name == 'XGBoost' else None
+    return {
+        'model_name': model_name,
+        'config_id': config_id(params),
+        'params': params,
+        'resource': resource,
+        'score': score,
+        'best_iteration': int(best_iteration) if best_iteration is not None else None,
+        'seconds': time.perf_counter() - start
+    }
+
+def rung_resources(resource_spec, eta):
+    """
+    Increasing per-candidate budgets from min to max, growing by a factor of eta
+    """
+    # The small epsilon keeps exact powers of eta from rounding down a rung
+    n_rungs = int(math.floor(math.log(resource_spec['max'] / resource_spec['min'], eta) + 1e-9)) + 1
+    resources = [resource_spec['min'] * eta ** rung for rung in range(n_rungs)]
+    resources[-1] = resource_spec['max']
+    if resource_spec['name'] != 'samples':
+        resources = [int(round(resource)) for resource in resources]
+    return resources
+
+def successive_halving(model_name, paths, n_candidates=27, eta=3, n_workers=1, n_threads=1,
+                       results_path=None, random_state=0, key=None):
+    """
+    Successive halving over sampled configurations of one trainer
+    
+    Every rung trains the surviving candidates on eta times the previous
+    budget in a process pool and keeps the best 1/eta of them. Each finished
+    trial is appended to results_path, and trials already recorded there are
+    reused instead of re-run, so an interrupted search resumes where it stopped.
+    Trials are tagged with key (see search_key) and only trials with the
+    same key are reused.
+    """
+    resource_spec = RESOURCES.get(model_name, DEFAULT_RESOURCE)
+    candidates = sample_candidates(SEARCH_SPACES[model_name], n_candidates, random_state)
+    finished = load_trials(results_path, key)
+    if results_path:
+        os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    
+    context = multiprocessing.get_context('spawn')
+    history = []
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+        for rung, resource in enumerate(rung_resources(resource_spec, eta)):
+            trials = []
+            futures = []
+            for params in candidates:
+                trial = finished.get((model_name, config_id(params), resource))
+                if trial is not None:
+                    trials.append(trial)
+                else:
+                    futures.append(pool.submit(_run_trial, model_name, params, resource_spec['name'],
+                                               resource, paths, n_threads))
+            for future in as_completed(futures):
+                trial = future.result()
+                trial['rung'] = rung
+                trial['search_key'] = key
+                trials.append(trial)
+                if results_path:
+                    with open(results_path, 'a') as f:
+                        f.write(json.dumps(trial) + '\n')
+            
+            # Ties keep the earlier sampled candidate, so resumed runs pick the same survivors
+            order = {config_id(params): i for i, params in enumerate(candidates)}
+            trials.sort(key=lambda trial: (-trial['score'], order[trial['config_id']]))
+            history.extend(trials)
+            print(f"{model_name} rung {rung}: {len(trials)} candidates at {resource_spec['name']}={resource}, "
+                  f"best score {trials[0]['score']:.3f} ({len(futures)} trained, {len(trials) - len(futures)} resumed)")
+            
+            # A lone survivor that already stopped early would not use a bigger round budget
+            if (len(trials) == 1 and trials[0]['best_iteration'] is not None and
+                    trials[0]['best_iteration'] + EARLY_STOPPING_ROUNDS < resource):
+                break
+            
+            keep = max(1, len(trials) // eta)
+            survivors = {trial['config_id'] for trial in trials[:keep]}
+            candidates = [params for params in candidates if config_id(params) in survivors]
+    
+    best = trials[0]
+    best_params = dict(best['params'])
+    if model_name == 'XGBoost' and best['best_iteration'] is not None:
+        # Refit with the number of rounds early stopping settled on
+        best_params['n_estimators'] = best['best_iteration'] + 1
+    return {'model_name': model_name, 'best_params': best_params, 'best_score': best['score'], 'trials': history}
+
+def search_hyperparameters(data, model_names=None, n_candidates=27, eta=3, n_jobs=None,
+                           results_path=DEFAULT_RESULTS_PATH, validation_size=0.2, random_state=0):
+    """
+    Tune each trainer with successive halving on a validation split of the training data
+    
+    Returns {model name: search result} with the best parameters, which can
+    be passed straight to the trainer functions as keyword arguments.
+    """
+    from sklearn.model_selection import train_test_split
+    model_names = model_names or list(SEARCH_SPACES)
+    n_cpus = n_jobs or os.cpu_count() or 1
+    
+    X_train, X_val, y_train, y_val = train_test_split(
+        np.asarray(data['X_train']), np.asarray(data['y_train']), test_size=validation_size,
+        random_state=random_state, stratify=np.asarray(data['y_train'])
+    )
+    
+    arrays = {'X_train': X_train, 'y_train': y_train, 'X_val': X_val, 'y_val': y_val}
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as shared_dir:
+        paths = _share_arrays(shared_dir, arrays)
+        for model_name in model_names:
+            start = time.perf_counter()
+            key = search_key(arrays, {
+                'model_name': model_name,
+                'search_space': SEARCH_SPACES[model_name],
+                'resource': RESOURCES.get(model_name, DEFAULT_RESOURCE),
+                'early_stopping_rounds': EARLY_STOPPING_ROUNDS,
+                'n_candidates': n_candidates,
+                'eta': eta,
+                'validation_size': validation_size,
+                'random_state': random_state
+            })
+            # Trials of one model run side by side, so split the cores between them
+            n_workers = min(n_candidates, n_cpus)
+            results[model_name] = successive_halving(
+                model_name, paths, n_candidates=n_candidates, eta=eta, n_workers=n_workers,
+                n_threads=max(1, n_cpus // n_workers), results_path=results_path, random_state=random_state,
+                key=key
+            )
+            print(f"{model_name}: best {results[model_name]['best_params']} "
+                  f"(validation accuracy {results[model_name]['best_score']:.3f}, {time.perf_counter() - start:.1f}s)")
+    return results
+
+def main():
+    """
+    Command-line entry point for tuning the trainers
+    """
+    parser = argparse.ArgumentParser(description='Tune the model trainers with successive halving')
+    parser.add_argument('--models', nargs='+', choices=list(SEARCH_SPACES), default=list(SEARCH_SPACES))
+    parser.add_argument('--candidates', type=int, default=27, help='Configurations sampled per model')
+    parser.add_argument('--eta', type=int, default=3, help='Keep 1/eta of the candidates at each rung')
+    parser.add_argument('--jobs', type=int, default=None, help='CPU cores to use (default all)')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_PATH,
+                        help='JSON Lines file of finished trials; rerun with the same file to resume')
+    args = parser.parse_args()
+    
+    from data_preprocessing import main as preprocess_data
+    data = preprocess_data()
+    results = search_hyperparameters(data, args.models, args.candidates, args.eta, args.jobs, args.results)
+    
+    print("\nBest hyperparameters")
+    for model_name, result in results.items():
+        print(f"{model_name}: {json.dumps(result['best_params'])}")
+
+if __name__ == "__main__":
+    main()
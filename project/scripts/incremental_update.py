@@ -0,0 +1,212 @@
+import argparse
+import copy
+import time
+import numpy as np
+import pandas as pd
+from data_preprocessing import encode_categorical_features
+from prediction_engine import StudentPerformancePredictor
+
+def update_scaler(scaler, X_encoded):
+    """
+    Copy of a fitted StandardScaler whose running mean and variance also cover the new rows
+    """
+    updated = copy.deepcopy(scaler)
+    updated.partial_fit(X_encoded)
+    return updated
+
+def _affine(scaler):
+    mean = scaler.mean_ if getattr(scaler, 'with_mean', True) else np.zeros_like(scaler.mean_)
+    scale = scaler.scale_ if getattr(scaler, 'with_std', True) else np.ones_like(scaler.mean_)
+    return mean, scale
+
+def rebase_linear_model(model, old_scaler, new_scaler):
+    """
+    Re-express a linear model trained on old_scaler features so it makes the same decisions on new_scaler features
+    
+    w . (x - m0) / s0 + b  ==  (w * s1 / s0) . (x - m1) / s1 + b + w . (m1 - m0) / s0
+    """
+    old_mean, old_scale = _affine(old_scaler)
+    new_mean, new_scale = _affine(new_scaler)
+    model = copy.deepcopy(model)
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    model.intercept_ = model.intercept_ + (coef * (new_mean - old_mean) / old_scale).sum(axis=1)
+    model.coef_ = coef * (new_scale / old_scale)
+    return model
+
+def update_linear_model(model, X, y, n_seen, epochs=5, eta0=0.01):
+    """
+    Continue training a linear model on new rows with partial_fit
+    
+    LogisticRegression has no partial_fit, so it is continued as an
+    SGDClassifier with the same log loss and L2 strength, starting from its
+    coefficients; the result supports partial_fit for later updates.
+    """
+    if hasattr(model, 'partial_fit'):
+        model = copy.deepcopy(model)
+        for _ in range(epochs):
+            model.partial_fit(X, y)
+        return model
+    
+    from sklearn.linear_model import SGDClassifier
+    # LogisticRegression minimizes C * sum(loss) + ||w||^2 / 2, SGD mean(loss) + alpha * ||w||^2 / 2
+    sgd = SGDClassifier(loss='log_loss', alpha=1.0 / (model.C * n_seen), learning_rate='constant', eta0=eta0,
+                        max_iter=epochs, tol=None, random_state=42)
+    sgd.fit(X, y, coef_init=model.coef_, intercept_init=model.intercept_)
+    return sgd
+
+def update_random_forest(model, X, y, n_new_trees):
+    """
+    Add n_new_trees trees fitted on the new rows with warm_start, keeping the existing ones
+    
+    Every class the forest knows must appear in the new rows: a tree fitted
+    on fewer classes has narrower probability outputs, which breaks
+    predict_proba for the whole ensemble.
+    """
+    new_classes = np.unique(y)
+    if not np.array_equal(new_classes, model.classes_):
+        raise ValueError(f"New rows contain classes {new_classes.tolist()} but the forest was trained on "
+                         f"{model.classes_.tolist()}; warm-started trees need every class, retrain instead")
+    model = copy.deepcopy(model)
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new_trees)
+    model.fit(X, y)
+    model.set_params(warm_start=False)
+    return model
+
+def update_xgboost(model, X, y, n_rounds):
+    """
+    Continue boosting from the existing booster for n_rounds rounds on the new rows
+    """
+    import xgboost as xgb
+    params = model.get_params()
+    params.update(n_estimators=n_rounds, early_stopping_rounds=None)
+    updated = xgb.XGBClassifier(**params)
+    updated.fit(X, y, xgb_model=model.get_booster())
+    return updated
+
+def incremental_update(predictor, new_data, label_column='performance', n_seen=None, n_new_trees=None,
+                       n_rounds=20, epochs=5):
+    """
+    Update a loaded predictor with newly labelled student records instead of retraining
+    
+    Linear models extend the scaler's running statistics, are rebased
+    exactly onto the refreshed scaler and continue with partial_fit.
+    RandomForest adds warm-started trees (by default in proportion to the
+    new rows) and XGBoost continues boosting; tree splits do not depend on
+    feature scaling, so tree models keep the scaler they were trained with.
+    n_seen is the number of rows the model has already been trained on and
+    defaults to the scaler's n_samples_seen_.
+    
+    Returns a new StudentPerformancePredictor and a report dict; the input
+    predictor is left untouched so it can keep serving.
+    """
+    start = time.perf_counter()
+    model = predictor.model
+    scaler = predictor.scaler
+    X_encoded = encode_categorical_features(new_data)[predictor.feature_names]
+    y = new_data[label_column].to_numpy()
+    n_new = len(new_data)
+    if n_seen is None:
+        n_seen = int(np.max(scaler.n_samples_seen_))
+    report = {'model_type': type(model).__name__, 'n_new_rows': n_new, 'n_seen_rows': n_seen}
+    
+    if hasattr(model, 'coef_'):
+        new_scaler = update_scaler(scaler, X_encoded)
+        model = rebase_linear_model(model, scaler, new_scaler)
+        model = update_linear_model(model, new_scaler.transform(X_encoded), y, n_seen + n_new, epochs)
+        scaler = new_scaler
+        report['strategy'] = 'partial_fit'
+    elif hasattr(model, 'estimators_') and hasattr(model, 'warm_start'):
+        if n_new_trees is None:
+            # New trees get the same share of the votes as the new rows have of the data
+            n_new_trees = max(1, int(round(len(model.estimators_) * n_new / n_seen)))
+        model = update_random_forest(model, scaler.transform(X_encoded), y, n_new_trees)
+        report['strategy'] = 'warm_start'
+        report['n_new_trees'] = n_new_trees
+    elif hasattr(model, 'get_booster'):
+        model = update_xgboost(model, scaler.transform(X_encoded), y, n_rounds)
+        report['strategy'] = 'continue_boosting'
+        report['n_new_rounds'] = n_rounds
+    else:
+        raise ValueError(f"{type(model).__name__} does not support incremental updates, retrain it with model_training")
+    
+    updated = StudentPerformancePredictor(model=model, scaler=scaler)
+    updated.feature_names = list(predictor.feature_names)
+    report['seconds'] = time.perf_counter() - start
+    print(f"Updated {report['model_type']} with {n_new} rows via {report['strategy']} in {report['seconds']:.2f}s")
+    return updated, report
+
+def _accuracy(predictor, test_data, label_column):
+    X = predictor.preprocess_input(test_data.drop(columns=label_column))
+    return float(np.mean(predictor.model.predict(X) == test_data[label_column].to_numpy()))
+
+def check_against_full_retrain(updated_predictor, train_func, old_data, new_data, test_data,
+                               label_column='performance', tolerance=0.02):
+    """
+    Compare an incrementally updated predictor against a full retrain on old + new rows
+    
+    Returns both test accuracies and whether the update is within tolerance
+    (absolute accuracy) of the full retrain.
+    """
+    from sklearn.preprocessing import StandardScaler
+    combined = pd.concat([old_data, new_data], ignore_index=True)
+    X_full = encode_categorical_features(combined)[updated_predictor.feature_names]
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X_full)
+    
+    start = time.perf_counter()
+    retrained = StudentPerformancePredictor(model=train_func(X_scaled, combined[label_column].to_numpy()),
+                                            scaler=scaler)
+    retrain_seconds = time.perf_counter() - start
+    
+    report = {
+        'updated_accuracy': _accuracy(updated_predictor, test_data, label_column),
+        'retrained_accuracy': _accuracy(retrained, test_data, label_column),
+        'retrain_seconds': retrain_seconds,
+        'tolerance': tolerance
+    }
+    report['accuracy_gap'] = report['retrained_accuracy'] - report['updated_accuracy']
+    report['within_tolerance'] = report['accuracy_gap'] <= tolerance
+    print(f"Incremental update accuracy {report['updated_accuracy']:.3f} vs full retrain "
+          f"{report['retrained_accuracy']:.3f} (retrain took {retrain_seconds:.2f}s): "
+          f"{'within' if report['within_tolerance'] else 'OUTSIDE'} tolerance {tolerance}")
+    return report
+
+def main():
+    """
+    Command-line entry point for updating a saved model with new student records
+    """
+    parser = argparse.ArgumentParser(description='Incrementally update a saved model with new labelled students')
+    parser.add_argument('new_data', help='CSV of new students with the feature columns and a label column')
+    parser.add_argument('--model', required=True, help='Path to a model saved with save_model')
+    parser.add_argument('--output', required=True, help='Where to save the updated model')
+    parser.add_argument('--label-column', default='performance')
+    parser.add_argument('--n-seen', type=int, default=None,
+                        help="Rows the model was already trained on (default: the scaler's count)")
+    parser.add_argument('--check-data', help='CSV the model was originally trained on, to compare with a full retrain')
+    parser.add_argument('--test-data', help='Labelled CSV used for the tolerance check')
+    parser.add_argument('--tolerance', type=float, default=0.02)
+    args = parser.parse_args()
+    
+    predictor = StudentPerformancePredictor()
+    predictor.load_model(args.model)
+    new_data = pd.read_csv(args.new_data)
+    updated, _ = incremental_update(predictor, new_data, args.label_column, n_seen=args.n_seen)
+    
+    if args.check_data and args.test_data:
+        import model_training
+        trainers = {
+            'LogisticRegression': model_training.train_logistic_regression,
+            'SGDClassifier': model_training.train_logistic_regression,
+            'RandomForestClassifier': model_training.train_random_forest,
+            'XGBClassifier': model_training.train_xgboost
+        }
+        report = check_against_full_retrain(updated, trainers[type(predictor.model).__name__],
+                                            pd.read_csv(args.check_data), new_data, pd.read_csv(args.test_data),
+                                            args.label_column, args.tolerance)
+        if not report['within_tolerance']:
+            raise SystemExit("Updated model is outside the accuracy tolerance; not saving it")
+    
+    updated.save_model(args.output)
+
+if __name__ == "__main__":
+    main()
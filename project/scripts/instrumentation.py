@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+
+# Histogram buckets grow by 2 ** (1/4) from 1 microsecond to about 67 seconds
+BUCKETS_PER_OCTAVE = 4
+BUCKET_BOUNDS = [1e-6 * 2 ** (i / BUCKETS_PER_OCTAVE) for i in range(BUCKETS_PER_OCTAVE * 26 + 1)]
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with percentile estimates
+    """
+    
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds):
+        if seconds <= BUCKET_BOUNDS[0]:
+            index = 0
+        else:
+            index = min(len(BUCKET_BOUNDS), math.ceil(math.log2(seconds / BUCKET_BOUNDS[0]) * BUCKETS_PER_OCTAVE))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+    
+    def percentile(self, q):
+        """
+        Estimate the q-th percentile (0-100) in seconds, interpolating inside the bucket
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0.0
+                fraction = (rank - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+        return self.max
+    
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.sum / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000
+        }
+
+class StageClock:
+    """
+    Times consecutive stages of one call; lap(stage) closes the stage that just ran
+    """
+    
+    __slots__ = ('_instrumentation', 'operation', '_laps', '_start', '_last')
+    
+    def __init__(self, instrumentation, operation):
+        self._instrumentation = instrumentation
+        self.operation = operation
+        self._laps = []
+        self._start = self._last = time.perf_counter()
+    
+    def lap(self, stage):
+        now = time.perf_counter()
+        self._laps.append((stage, now - self._last))
+        self._last = now
+    
+    def finish(self, model_type):
+        """
+        Record the laps and the total call time under the given model type
+        """
+        self._laps.append(('total', time.perf_counter() - self._start))
+        self._instrumentation.record(self.operation, model_type, self._laps)
+
+class PredictionInstrumentation:
+    """
+    In-process per-stage latency histograms keyed by (operation, model type, stage)
+    
+    Attach one to StudentPerformancePredictor.instrumentation to opt in;
+    with it left as None each stage costs a single None check.
+    """
+    
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+    
+    def start(self, operation):
+        return StageClock(self, operation)
+    
+    def record(self, operation, model_type, laps):
+        with self._lock:
+            for stage, seconds in laps:
+                key = (operation, model_type, stage)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = LatencyHistogram()
+                histogram.observe(seconds)
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+    
+    def snapshot(self):
+        """
+        Nested dict: operation -> model type -> stage -> count/mean/p50/p95/p99/max in ms
+        """
+        with self._lock:
+            items = [(key, histogram.snapshot()) for key, histogram in self._histograms.items()]
+        snapshot = {}
+        for (operation, model_type, stage), stats in sorted(items):
+            snapshot.setdefault(operation, {}).setdefault(model_type, {})[stage] = stats
+        return snapshot
+    
+    def to_prometheus(self, metric_name='student_prediction_stage_seconds'):
+        """
+        Histograms in the Prometheus text exposition format
+        """
+        lines = [
+            f'# HELP {metric_name} Latency of each StudentPerformancePredictor stage.',
+            f'# TYPE {metric_name} histogram'
+        ]
+        with self._lock:
+            for (operation, model_type, stage), histogram in sorted(self._histograms.items()):
+                labels = f'operation="{operation}",model="{model_type}",stage="{stage}"'
+                cumulative = 0
+                # Export every octave; cumulative counts at those bounds stay exact
+                for index, bound in enumerate(BUCKET_BOUNDS):
+                    cumulative += histogram.counts[index]
+                    if index % BUCKETS_PER_OCTAVE == 0:
+                        lines.append(f'{metric_name}_bucket{{{labels},le="{bound:.9g}"}} {cumulative}')
+                lines.append(f'{metric_name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric_name}_sum{{{labels}}} {histogram.sum:.9g}')
+                lines.append(f'{metric_name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
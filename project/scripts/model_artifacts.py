@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import numpy as np
+from tree_engine import FlatTreeEnsemble
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+def is_artifact(path):
+    """
+    Check whether a path is a memory-mappable model artifact directory
+    """
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+def _hash_file(digest, filepath, block_size=1 << 20):
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+
+def save_artifact(model, scaler, feature_names, directory, keep_native=False):
+    """
+    Save a model as a directory of memory-mappable arrays plus a manifest
+    
+    RandomForest and XGBoost models are flattened into .npy node tables that load_artifact
+    memory-maps directly. With keep_native=True the native estimator is also
+    written, for predictors to load lazily once a batch is large enough that
+    its compiled traversal beats the flat engine; unpickling it copies every
+    tree into private memory, so it is off by default. Other models are
+    dumped uncompressed with joblib, whose NumPy arrays (support vectors, KNN
+    training matrix, coefficients) are memory-mapped on load.
+    """
+    import joblib
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'feature_names': list(feature_names),
+        'arrays': {}
+    }
+    files = []
+    
+    ensemble = FlatTreeEnsemble.from_model(model)
+    if ensemble is not None:
+        manifest['model_type'] = 'flat_tree_ensemble'
+        manifest['ensemble'] = ensemble.metadata()
+        for name, array in ensemble.arrays().items():
+            filename = f'{name}.npy'
+            np.save(os.path.join(directory, filename), np.ascontiguousarray(array))
+            manifest['arrays'][name] = {'file': filename, 'dtype': str(array.dtype), 'shape': list(array.shape)}
+            files.append(filename)
+        if keep_native and not isinstance(model, FlatTreeEnsemble):
+            manifest['native_model_file'] = 'model.joblib'
+            joblib.dump(model, os.path.join(directory, 'model.joblib'))
+            files.append('model.joblib')
+    else:
+        manifest['model_type'] = 'joblib'
+        joblib.dump(model, os.path.join(directory, 'model.joblib'))
+        files.append('model.joblib')
+    
+    joblib.dump(scaler, os.path.join(directory, 'scaler.joblib'))
+    files.append('scaler.joblib')
+    
+    # Content hash computed once at save time, so loading never reads the arrays
+    digest = hashlib.sha256()
+    for filename in files:
+        _hash_file(digest, os.path.join(directory, filename))
+    manifest['fingerprint'] = digest.hexdigest()
+    
+    # Write the manifest last so a partially written artifact is never loadable
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
+
+def load_artifact(directory):
+    """
+    Load an artifact written by save_artifact with its arrays memory-mapped read-only
+    
+    Returns the same keys as the joblib model file plus the saved fingerprint.
+    For tree ensembles 'model' is the memory-mapped FlatTreeEnsemble and,
+    if the artifact kept one, 'native_model_path' is the native estimator's
+    file; nothing reads it until a caller asks for it.
+    """
+    import joblib
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact format: {manifest.get('format_version')}")
+    
+    if manifest['model_type'] == 'flat_tree_ensemble':
+        arrays = {
+            name: np.load(os.path.join(directory, spec['file']), mmap_mode='r')
+            for name, spec in manifest['arrays'].items()
+        }
+        model = FlatTreeEnsemble.from_arrays(manifest['ensemble'], arrays)
+        native_model_file = manifest.get('native_model_file')
+    else:
+        native_model_file = None
+        # Copy-on-write: libsvm wants writable buffers but never writes, so pages stay shared
+        model = joblib.load(os.path.join(directory, 'model.joblib'), mmap_mode='c')
+    
+    model_data = {
+        'model': model,
+        'scaler': joblib.load(os.path.join(directory, 'scaler.joblib')),
+        'feature_names': manifest['feature_names'],
+        'fingerprint': manifest['fingerprint']
+    }
+    if native_model_file is not None:
+        model_data['native_model_path'] = os.path.join(directory, native_model_file)
+    return model_data
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from prediction_engine import StudentPerformancePredictor
+
+REGISTRY_FILE = 'registry.json'
+VERSION_FILE = 'version.json'
+
+def _write_json_atomic(path, payload):
+    """
+    Write JSON through a temporary file and os.replace, so readers never see a partial file
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+def default_warmup_students(n_students=64):
+    """
+    Synthetic student records used to warm up a freshly loaded model
+    """
+    from data_preprocessing import load_and_preprocess_data
+    df = load_and_preprocess_data(n_samples=n_students, random_state=0)
+    return df.drop(columns='performance').to_dict('records')
+
+class ModelRegistry:
+    """
+    Versioned model directory with background loading and atomic hot-swap
+    
+    Layout:
+        <directory>/registry.json            active and previous version
+        <directory>/versions/<v>/version.json  manifest (model path, metrics, created_at)
+        <directory>/versions/<v>/model         saved model (joblib file or mmap artifact)
+    
+    Each version is served by its own fully loaded StudentPerformancePredictor.
+    The serving pair (version, predictor) is a single reference that is
+    replaced in one assignment, so a request sees either the old model and
+    scaler or the new ones, never a mix.
+    """
+    
+    def __init__(self, directory, cache_entries=0, instrumentation=None):
+        self.directory = directory
+        self.cache_entries = cache_entries
+        self.instrumentation = instrumentation
+        self._active = (None, None)
+        self._previous = (None, None)
+        self._swap_lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'versions'), exist_ok=True)
+    
+    def _version_dir(self, version):
+        return os.path.join(self.directory, 'versions', version)
+    
+    def publish(self, predictor, version=None, metrics=None, artifact_format='joblib'):
+        """
+        Save a predictor's model as a new registry version
+        
+        artifact_format='mmap' shares the model's arrays between server
+        worker processes; the default joblib file loads the model privately.
+        """
+        if version is None:
+            version = time.strftime('%Y%m%d-%H%M%S')
+        version_dir = self._version_dir(version)
+        if os.path.exists(os.path.join(version_dir, VERSION_FILE)):
+            raise ValueError(f"Model version already exists: {version}")
+        os.makedirs(version_dir, exist_ok=True)
+        
+        model_file = 'model' if artifact_format == 'mmap' else 'model.pkl'
+        predictor.save_model(os.path.join(version_dir, model_file), artifact_format=artifact_format)
+        
+        # The manifest is written last; a version without one is not listed
+        _write_json_atomic(os.path.join(version_dir, VERSION_FILE), {
+            'version': version,
+            'model_file': model_file,
+            'model_type': type(predictor.model).__name__,
+            'metrics': metrics or {},
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        })
+        return version
+    
+    def versions(self):
+        """
+        Manifests of all published versions, oldest first
+        """
+        manifests = []
+        versions_dir = os.path.join(self.directory, 'versions')
+        for version in sorted(os.listdir(versions_dir)):
+            manifest_path = os.path.join(versions_dir, version, VERSION_FILE)
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    manifests.append(json.load(f))
+        return manifests
+    
+    def _load_version(self, version, warmup_students):
+        """
+        Load and warm up a predictor for one version, off the serving path
+        """
+        with open(os.path.join(self._version_dir(version), VERSION_FILE)) as f:
+            manifest = json.load(f)
+        
+        predictor = StudentPerformancePredictor()
+        if self.cache_entries:
+            predictor.enable_cache(max_entries=self.cache_entries)
+        predictor.load_model(os.path.join(self._version_dir(version), manifest['model_file']))
+        
+        # Touch every lazy path (encoder, tree engine, memory-mapped pages) before serving
+        if warmup_students is None:
+            warmup_students = default_warmup_students()
+        if warmup_students:
+            predictor.batch_predict(warmup_students)
+            predictor.predict(warmup_students[0])
+            if predictor.cache is not None:
+                predictor.cache.clear()
+        # Attached after warmup so its calls stay out of the shared latency histograms
+        predictor.instrumentation = self.instrumentation
+        return predictor
+    
+    def _swap(self, version, predictor):
+        with self._swap_lock:
+            if self._active[1] is not None:
+                self._previous = self._active
+            self._active = (version, predictor)
+            _write_json_atomic(os.path.join(self.directory, REGISTRY_FILE), {
+                'active': version,
+                'previous': self._previous[0]
+            })
+    
+    def activate(self, version, warmup_students=None, background=True):
+        """
+        Load, warm up and swap in a version; returns a Future resolved once it serves traffic
+        
+        With background=True the current version keeps serving while the new
+        one loads in a separate thread.
+        """
+        if not os.path.exists(os.path.join(self._version_dir(version), VERSION_FILE)):
+            raise ValueError(f"Unknown model version: {version}")
+        future = Future()
+        
+        def load_and_swap():
+            try:
+                predictor = self._load_version(version, warmup_students)
+                self._swap(version, predictor)
+                future.set_result(version)
+            except Exception as e:
+                future.set_exception(e)
+        
+        if background:
+            threading.Thread(target=load_and_swap, name=f'load-model-{version}', daemon=True).start()
+        else:
+            load_and_swap()
+        return future
+    
+    def rollback(self):
+        """
+        Swap back to the previously active version, which is still loaded
+        """
+        with self._swap_lock:
+            if self._previous[1] is None:
+                raise ValueError("No previous model version to roll back to")
+            self._active, self._previous = self._previous, self._active
+            _write_json_atomic(os.path.join(self.directory, REGISTRY_FILE), {
+                'active': self._active[0],
+                'previous': self._previous[0]
+            })
+        return self._active[0]
+    
+    def load_active(self, warmup_students=None):
+        """
+        Load the version recorded as active in registry.json, e.g. on process start
+        """
+        with open(os.path.join(self.directory, REGISTRY_FILE)) as f:
+            state = json.load(f)
+        return self.activate(state['active'], warmup_students, background=False).result()
+    
+    @property
+    def active_version(self):
+        return self._active[0]
+    
+    @property
+    def predictor(self):
+        """
+        The predictor currently serving traffic
+        """
+        predictor = self._active[1]
+        if predictor is None:
+            raise ValueError("No model version is active. Activate a version first.")
+        return predictor
+    
+    @property
+    def cache(self):
+        return self._active[1].cache if self._active[1] is not None else None
+    
+    def check_students(self, students_data):
+        return self.predictor.check_students(students_data)
+    
+    def predict(self, student_data):
+        return self.predictor.predict(student_data)
+    
+    def batch_predict(self, students_data, chunk_size=10000):
+        return self.predictor.batch_predict(students_data, chunk_size)
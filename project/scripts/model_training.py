@@ -1,53 +1,127 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
-from sklearn.neighbors import KNeighborsClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report, confusion_matrix
-import xgboost as xgb
-import matplotlib.pyplot as plt
-import seaborn as sns
 from data_preprocessing import main as preprocess_data
+from neighbor_index import IndexedKNNClassifier
+from feature_importance import DEFAULT_IMPORTANCE_PATH, permutation_importance, write_importance
 
-def train_logistic_regression(X_train, y_train):
+# Trainers take hyperparameter overrides as keyword arguments, on top of these defaults
+
+def train_logistic_regression(X_train, y_train, n_jobs=None, **params):
     """
     Train Logistic Regression model
     """
-    model = LogisticRegression(random_state=42, max_iter=1000)
+    model = LogisticRegression(**{'random_state': 42, 'max_iter': 1000, **params})
     model.fit(X_train, y_train)
     return model
 
-def train_random_forest(X_train, y_train):
+def train_random_forest(X_train, y_train, n_jobs=None, **params):
     """
     Train Random Forest model
     """
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model = RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, 'n_jobs': n_jobs, **params})
     model.fit(X_train, y_train)
     return model
 
-def train_svm(X_train, y_train):
+# Above this many rows the exact RBF SVC (quadratic-or-worse fit plus a 5-fold
+# Platt calibration) is replaced by the kernel-approximation mode
+SVM_EXACT_MAX_ROWS = 10000
+
+def train_svm(X_train, y_train, n_jobs=None, mode='auto', **params):
     """
     Train Support Vector Machine model
+    
+    mode='exact' fits an RBF SVC, mode='approximate' uses
+    train_approximate_svm, and mode='auto' picks exact up to
+    SVM_EXACT_MAX_ROWS rows.
     """
-    model = SVC(kernel='rbf', random_state=42, probability=True)
+    if mode == 'auto':
+        mode = 'exact' if len(X_train) <= SVM_EXACT_MAX_ROWS else 'approximate'
+    if mode == 'approximate':
+        return train_approximate_svm(X_train, y_train, n_jobs=n_jobs, **params)
+    if mode != 'exact':
+        raise ValueError(f"Unknown SVM mode: {mode}")
+    model = SVC(**{'kernel': 'rbf', 'random_state': 42, 'probability': True, **params})
     model.fit(X_train, y_train)
     return model
 
-def train_knn(X_train, y_train):
+def train_approximate_svm(X_train, y_train, n_jobs=None, C=1.0, gamma='scale', n_components=500,
+                          calibration_size=0.2, random_state=42):
+    """
+    Train an RBF SVM approximated by Nystroem features and a linear solver
+    
+    The kernel map costs O(rows * n_components) and LinearSVC scales
+    linearly in rows, so this fits datasets far beyond the exact SVC. The
+    probabilities come from a single sigmoid calibration on a held-out
+    calibration_size split instead of SVC's internal 5-fold Platt scaling.
+    gamma='scale' means 1 / (n_features * X.var()), as in SVC.
+    """
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.frozen import FrozenEstimator
+    from sklearn.kernel_approximation import Nystroem
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import make_pipeline
+    from sklearn.svm import LinearSVC
+    
+    X_train = np.asarray(X_train)
+    y_train = np.asarray(y_train)
+    if gamma == 'scale':
+        variance = X_train.var()
+        gamma = 1.0 / (X_train.shape[1] * variance) if variance > 0 else 1.0
+    X_fit, X_calibration, y_fit, y_calibration = train_test_split(
+        X_train, y_train, test_size=calibration_size, random_state=random_state, stratify=y_train
+    )
+    
+    svm = make_pipeline(
+        Nystroem(kernel='rbf', gamma=gamma, n_components=min(n_components, len(X_fit)), random_state=random_state),
+        LinearSVC(C=C, dual='auto', random_state=random_state)
+    )
+    svm.fit(X_fit, y_fit)
+    model = CalibratedClassifierCV(FrozenEstimator(svm), method='sigmoid')
+    model.fit(X_calibration, y_calibration)
+    return model
+
+def train_knn(X_train, y_train, n_jobs=None, **params):
     """
     Train K-Nearest Neighbors model
+    
+    The neighbour index is built here and saved with the model; pass
+    index='ivf' (and n_probe) for approximate search over very large cohorts.
     """
-    model = KNeighborsClassifier(n_neighbors=5)
+    model = IndexedKNNClassifier(**{'n_neighbors': 5, 'index': 'kd_tree', 'n_jobs': n_jobs, **params})
     model.fit(X_train, y_train)
     return model
 
-def train_xgboost(X_train, y_train):
+def train_xgboost(X_train, y_train, n_jobs=None, eval_set=None, **params):
     """
     Train XGBoost model
+    
+    With eval_set and an early_stopping_rounds parameter, boosting stops once
+    the validation logloss stops improving.
     """
-    model = xgb.XGBClassifier(random_state=42, eval_metric='logloss')
-    model.fit(X_train, y_train)
+    import xgboost as xgb
+    model = xgb.XGBClassifier(**{'random_state': 42, 'eval_metric': 'logloss', 'n_jobs': n_jobs, **params})
+    if eval_set is not None:
+        model.fit(X_train, y_train, eval_set=eval_set, verbose=False)
+    else:
+        model.fit(X_train, y_train)
+    return model
+
+def classifier_from_booster(booster):
+    """
+    Wrap a binary Booster trained with xgb.train in an XGBClassifier, as train_xgboost returns
+    """
+    import xgboost as xgb
+    model = xgb.XGBClassifier()
+    model.load_model(bytearray(booster.save_raw('json')))
     return model
 
 def evaluate_model(model, X_test, y_test, model_name):
@@ -66,75 +140,162 @@ def evaluate_model(model, X_test, y_test, model_name):
     
     return metrics
 
-def plot_feature_importance(model, feature_names, model_name):
-    """
-    Plot feature importance for tree-based models
-    """
-    if hasattr(model, 'feature_importances_'):
-        importance = model.feature_importances_
-        feature_importance = pd.DataFrame({
-            'feature': feature_names,
-            'importance': importance
-        }).sort_values('importance', ascending=False)
-        
-        plt.figure(figsize=(10, 6))
-        sns.barplot(data=feature_importance, x='importance', y='feature')
-        plt.title(f'Feature Importance - {model_name}')
-        plt.xlabel('Importance')
-        plt.tight_layout()
-        plt.show()
-        
-        return feature_importance
-    else:
-        print(f"Feature importance not available for {model_name}")
-        return None
+MODEL_TRAINERS = {
+    'Logistic Regression': train_logistic_regression,
+    'Random Forest': train_random_forest,
+    'Support Vector Machine': train_svm,
+    'K-Nearest Neighbors': train_knn,
+    'XGBoost': train_xgboost
+}
+
+IMPORTANCE_REPEATS = 10
+
+# Large ensembles worth distilling; the other models are already small
+DISTILLABLE_MODELS = {'Random Forest', 'XGBoost'}
+
+# Trainers that use more than one core when given n_jobs; the others get one core each
+MULTICORE_MODELS = {'Random Forest', 'K-Nearest Neighbors', 'XGBoost'}
+
+def split_cpu_budget(model_names, n_cpus):
+    """
+    Threads per model so that concurrently running trainers use at most n_cpus cores
+    """
+    budget = {name: 1 for name in model_names}
+    multicore = [name for name in model_names if name in MULTICORE_MODELS]
+    spare = n_cpus - len(model_names)
+    # Cores left after one per model go to the trainers that can use them
+    for i, name in enumerate(multicore):
+        if spare > 0:
+            budget[name] += spare // len(multicore) + (1 if i < spare % len(multicore) else 0)
+    return budget
+
+def _share_arrays(directory, arrays):
+    """
+    Save arrays as .npy files that worker processes memory-map instead of unpickling copies
+    """
+    paths = {}
+    for name, array in arrays.items():
+        paths[name] = os.path.join(directory, f'{name}.npy')
+        np.save(paths[name], np.ascontiguousarray(np.asarray(array)))
+    return paths
+
+def _train_in_worker(model_name, train_func, paths, n_threads):
+    """
+    Load the shared matrices copy-on-write, then train and evaluate one model within its thread budget
+    """
+    from threadpoolctl import threadpool_limits
+    arrays = {name: np.load(path, mmap_mode='c') for name, path in paths.items()}
+    
+    start = time.perf_counter()
+    # Caps BLAS and OpenMP pools too, not just the estimator's own n_jobs
+    with threadpool_limits(limits=n_threads):
+        model = train_func(arrays['X_train'], arrays['y_train'], n_jobs=n_threads)
+        fit_seconds = time.perf_counter() - start
+        metrics = evaluate_model(model, arrays['X_test'], arrays['y_test'], model_name)
+    metrics['fit_seconds'] = fit_seconds
+    metrics['n_threads'] = n_threads
+    return model_name, model, metrics
+
+def train_models_parallel(data, trainers=None, n_jobs=None):
+    """
+    Train and evaluate independent models concurrently in a process pool
+    
+    The CPU budget (n_jobs, default all cores) is split across the models
+    with split_cpu_budget, and the preprocessed matrices are shared through
+    memory-mapped files. Returns (trained_models, results) with results in
+    the order of trainers, each with its fit time and thread count.
+    """
+    trainers = trainers or MODEL_TRAINERS
+    n_cpus = n_jobs or os.cpu_count() or 1
+    budget = split_cpu_budget(list(trainers), n_cpus)
+    
+    trained_models = {}
+    metrics_by_model = {}
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as shared_dir:
+        paths = _share_arrays(shared_dir, {name: data[name] for name in ['X_train', 'y_train', 'X_test', 'y_test']})
+        # Spawned workers do not inherit OpenMP thread state from the parent, which can deadlock after fork
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(len(trainers), n_cpus), mp_context=context) as pool:
+            futures = [pool.submit(_train_in_worker, name, train_func, paths, budget[name])
+                       for name, train_func in trainers.items()]
+            for future in as_completed(futures):
+                model_name, model, metrics = future.result()
+                metrics['wall_seconds'] = time.perf_counter() - start
+                trained_models[model_name] = model
+                metrics_by_model[model_name] = metrics
+                print(f"Finished {model_name} in {metrics['fit_seconds']:.2f}s "
+                      f"({metrics['n_threads']} threads, accuracy {metrics['accuracy']:.3f})")
+    
+    total_seconds = time.perf_counter() - start
+    print(f"Trained {len(trainers)} models in {total_seconds:.2f}s wall-clock "
+          f"(sum of fit times {sum(m['fit_seconds'] for m in metrics_by_model.values()):.2f}s)")
+    return {name: trained_models[name] for name in trainers}, [metrics_by_model[name] for name in trainers]
 
-def main():
+def main(parallel=True, n_jobs=None, distill_path=None, max_accuracy_drop=0.01,
+         importance_path=DEFAULT_IMPORTANCE_PATH, compact=False):
     """
     Main training pipeline
+    
+    compact=True trains on the float32 preprocessing outputs (see
+    data_preprocessing.main), halving the memory of the shared matrices.
+    
+    Permutation importance of every model is written to importance_path
+    (pass None to skip it).
+    
+    With distill_path set, the best model, if it is a tree ensemble, is
+    distilled into a compact student model (see distillation.distill)
+    saved there, provided it is within max_accuracy_drop of the best
+    model's accuracy and smaller and faster than it.
     """
     print("Starting model training pipeline...")
     
     # Load preprocessed data
-    data = preprocess_data()
+    data = preprocess_data(compact=compact)
     X_train = data['X_train']
     X_test = data['X_test']
     y_train = data['y_train']
     y_test = data['y_test']
     feature_names = data['feature_names']
     
-    # Define models to train
-    models = {
-        'Logistic Regression': train_logistic_regression,
-        'Random Forest': train_random_forest,
-        'Support Vector Machine': train_svm,
-        'K-Nearest Neighbors': train_knn,
-        'XGBoost': train_xgboost
-    }
-    
-    results = []
-    trained_models = {}
+    # A single core gains nothing from worker processes but their start-up cost
+    if parallel and (n_jobs or os.cpu_count() or 1) > 1:
+        # Independent trainers run concurrently, each within its share of the cores
+        print(f"\nTraining {len(MODEL_TRAINERS)} models in parallel...")
+        trained_models, results = train_models_parallel(data, MODEL_TRAINERS, n_jobs)
+    else:
+        results = []
+        trained_models = {}
+        start = time.perf_counter()
+        for model_name, train_func in MODEL_TRAINERS.items():
+            print(f"\nTraining {model_name}...")
+            
+            # Train model
+            fit_start = time.perf_counter()
+            model = train_func(X_train, y_train, n_jobs=n_jobs)
+            fit_seconds = time.perf_counter() - fit_start
+            trained_models[model_name] = model
+            
+            # Evaluate model
+            metrics = evaluate_model(model, X_test, y_test, model_name)
+            metrics['fit_seconds'] = fit_seconds
+            metrics['wall_seconds'] = time.perf_counter() - start
+            results.append(metrics)
+        print(f"Trained {len(MODEL_TRAINERS)} models in {time.perf_counter() - start:.2f}s wall-clock")
     
-    # Train and evaluate each model
-    for model_name, train_func in models.items():
-        print(f"\nTraining {model_name}...")
-        
-        # Train model
-        model = train_func(X_train, y_train)
-        trained_models[model_name] = model
-        
-        # Evaluate model
-        metrics = evaluate_model(model, X_test, y_test, model_name)
-        results.append(metrics)
-        
+    for metrics in results:
+        model_name = metrics['model_name']
+        print(f"\n{model_name} (fit {metrics['fit_seconds']:.2f}s)")
         print(f"Accuracy: {metrics['accuracy']:.3f}")
         print(f"Precision: {metrics['precision']:.3f}")
         print(f"Recall: {metrics['recall']:.3f}")
         print(f"F1-Score: {metrics['f1_score']:.3f}")
-        
-        # Plot feature importance for applicable models
-        if model_name in ['Random Forest', 'XGBoost']:
-            plot_feature_importance(model, feature_names, model_name)
+    
+    # Written as data rather than shown, so headless runs never block; plot with feature_importance.py
+    if importance_path:
+        importance = permutation_importance(trained_models, X_test, y_test, feature_names,
+                                            n_repeats=IMPORTANCE_REPEATS, n_jobs=n_jobs)
+        write_importance(importance, importance_path, n_repeats=IMPORTANCE_REPEATS, n_rows=len(X_test))
     
     # Create results summary
     results_df = pd.DataFrame(results)
@@ -150,6 +311,19 @@ def main():
     print(f"\nBest performing model: {best_model_name}")
     print(f"Best accuracy: {best_accuracy:.3f}")
     
+    if distill_path and best_model_name not in DISTILLABLE_MODELS:
+        print(f"\nNot distilling {best_model_name}: only tree ensembles are distilled")
+    elif distill_path:
+        from distillation import distill
+        from prediction_engine import StudentPerformancePredictor
+        print(f"\nDistilling {best_model_name}...")
+        teacher = StudentPerformancePredictor(model=trained_models[best_model_name], scaler=data['scaler'])
+        student, report = distill(teacher, data, max_accuracy_drop=max_accuracy_drop)
+        if report['within_budget']:
+            student.save_model(distill_path)
+        else:
+            print("No smaller, faster student within the accuracy budget; keep serving the full model")
+    
     return trained_models, results_df
 
 if __name__ == "__main__":
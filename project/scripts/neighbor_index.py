@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index: an inverted file over k-means cells
+    
+    The training rows are grouped by their nearest of n_lists centroids and
+    stored contiguously per cell. A query only scans the n_probe cells whose
+    centroids are closest to it, so the cost per query is roughly
+    n_probe / n_lists of a brute-force scan; raising n_probe trades latency
+    for recall. All state is plain NumPy arrays, so it memory-maps on load.
+    """
+    
+    ARRAY_NAMES = ('centroids', 'data', 'squared_norms', 'ids', 'offsets')
+    
+    def __init__(self, centroids, data, squared_norms, ids, offsets):
+        self.centroids = centroids
+        self.data = data
+        self.squared_norms = squared_norms
+        self.ids = ids
+        self.offsets = offsets
+    
+    @classmethod
+    def build(cls, X, n_lists=None, random_state=42):
+        from sklearn.cluster import MiniBatchKMeans
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if n_lists is None:
+            # sqrt(n) cells balances the centroid scan against the cell scans
+            n_lists = int(np.sqrt(len(X)))
+        n_lists = max(1, min(n_lists, len(X)))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=random_state, n_init=1, batch_size=4096)
+        kmeans.fit(X)
+        labels = kmeans.predict(X)
+        order = np.argsort(labels, kind='stable')
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=offsets[1:])
+        data = X[order]
+        return cls(kmeans.cluster_centers_, data, np.einsum('ij,ij->i', data, data), order.astype(np.int64), offsets)
+    
+    def arrays(self):
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+    
+    def query(self, X, k, n_probe=8):
+        """
+        Distances and training row indices of the (approximately) k nearest rows, closest first
+        
+        Rows whose probed cells hold fewer than k points are padded with
+        an infinite distance and index -1.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_queries = len(X)
+        n_probe = min(n_probe, len(self.centroids))
+        query_norms = np.einsum('ij,ij->i', X, X)
+        
+        centroid_distances = (query_norms[:, None] - 2.0 * X @ self.centroids.T
+                              + np.einsum('ij,ij->i', self.centroids, self.centroids))
+        probes = np.argpartition(centroid_distances, n_probe - 1, axis=1)[:, :n_probe]
+        
+        best_distances = np.full((n_queries, k), np.inf)
+        best_ids = np.full((n_queries, k), -1, dtype=np.int64)
+        # Visit each probed cell once and score every query that probes it in one product
+        flat_cells = probes.ravel()
+        cell_order = np.argsort(flat_cells, kind='stable')
+        flat_cells = flat_cells[cell_order]
+        flat_queries = cell_order // n_probe
+        bounds = np.flatnonzero(np.diff(flat_cells)) + 1
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(flat_cells)]):
+            cell = flat_cells[start]
+            lo, hi = self.offsets[cell], self.offsets[cell + 1]
+            if lo == hi:
+                continue
+            queries = flat_queries[start:stop]
+            distances = (query_norms[queries, None] - 2.0 * X[queries] @ self.data[lo:hi].T
+                         + self.squared_norms[lo:hi])
+            candidates = np.concatenate([best_distances[queries], distances], axis=1)
+            candidate_ids = np.concatenate([best_ids[queries], np.broadcast_to(self.ids[lo:hi], distances.shape)],
+                                           axis=1)
+            if candidates.shape[1] > k:
+                keep = np.argpartition(candidates, k - 1, axis=1)[:, :k]
+                candidates = np.take_along_axis(candidates, keep, axis=1)
+                candidate_ids = np.take_along_axis(candidate_ids, keep, axis=1)
+            best_distances[queries] = candidates
+            best_ids[queries] = candidate_ids
+        
+        order = np.argsort(best_distances, axis=1, kind='stable')
+        best_distances = np.take_along_axis(best_distances, order, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        # The expanded form can dip slightly below zero for near-identical rows
+        return np.sqrt(np.maximum(best_distances, 0.0)), best_ids
+
+class IndexedKNNClassifier(ClassifierMixin, BaseEstimator):
+    """
+    K-nearest-neighbours classifier backed by an explicit spatial index
+    
+    index='kd_tree' builds an exact scikit-learn KDTree at fit time;
+    index='ivf' builds an IVFIndex for approximate search over very large
+    cohorts, scanning n_probe cells per query. The index is part of the
+    fitted model, so it is saved and loaded with the model artifact instead
+    of being rebuilt. Batches of at least min_parallel_rows rows are split
+    across n_jobs threads (both searches release the GIL in their inner
+    loops). Predictions match KNeighborsClassifier for the exact index,
+    including its tie-breaking towards the smaller class label.
+    """
+    
+    def __init__(self, n_neighbors=5, weights='uniform', index='kd_tree', leaf_size=40, n_lists=None,
+                 n_probe=8, n_jobs=None, min_parallel_rows=2048, random_state=42):
+        if weights not in ('uniform', 'distance'):
+            raise ValueError(f"Unknown weights: {weights}")
+        if index not in ('kd_tree', 'ivf'):
+            raise ValueError(f"Unknown neighbour index: {index}")
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.index = index
+        self.leaf_size = leaf_size
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_jobs = n_jobs
+        self.min_parallel_rows = min_parallel_rows
+        self.random_state = random_state
+    
+    def fit(self, X, y):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+        self.n_features_in_ = X.shape[1]
+        if self.index == 'kd_tree':
+            from sklearn.neighbors import KDTree
+            self.index_ = KDTree(X, leaf_size=self.leaf_size)
+        else:
+            self.index_ = IVFIndex.build(X, self.n_lists, self.random_state)
+        return self
+    
+    def _query_chunk(self, X):
+        k = min(self.n_neighbors, len(self._y))
+        if self.index == 'kd_tree':
+            return self.index_.query(X, k=k)
+        return self.index_.query(X, k, self.n_probe)
+    
+    def kneighbors(self, X):
+        """
+        Distances and training row indices of each row's neighbours, closest first
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_jobs = self.n_jobs if self.n_jobs and self.n_jobs > 0 else os.cpu_count() or 1
+        if n_jobs == 1 or len(X) < self.min_parallel_rows:
+            return self._query_chunk(X)
+        chunks = np.array_split(X, max(1, min(n_jobs, len(X) // max(1, self.min_parallel_rows // 2))))
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            results = list(pool.map(self._query_chunk, chunks))
+        return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+    
+    def predict_proba(self, X):
+        distances, indices = self.kneighbors(X)
+        found = indices >= 0
+        labels = self._y[np.where(found, indices, 0)]
+        if self.weights == 'uniform':
+            weights = found.astype(np.float64)
+        else:
+            with np.errstate(divide='ignore'):
+                weights = np.where(found, 1.0 / distances, 0.0)
+            # As in scikit-learn, exact matches outvote every other neighbour
+            exact = distances == 0
+            has_exact = exact.any(axis=1)
+            weights[has_exact] = exact[has_exact]
+        
+        probability = np.zeros((len(labels), len(self.classes_)))
+        for class_index in range(len(self.classes_)):
+            probability[:, class_index] = np.where(labels == class_index, weights, 0.0).sum(axis=1)
+        totals = probability.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+        return probability / totals
+    
+    def predict(self, X):
+        # argmax keeps the first maximum, i.e. the smaller label, like scikit-learn's mode
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from data_preprocessing import FEATURE_COLUMNS, load_and_preprocess_data, encode_categorical_features
+from prediction_engine import StudentPerformancePredictor
+
+# Out-of-core training: raw CSV -> encoded .npy shards of at most chunk_size
+# rows -> streaming passes over the shards. Only one shard (plus the model)
+# is ever in memory, so peak memory is set by chunk_size, not by the dataset.
+
+MANIFEST_FILE = 'manifest.json'
+
+def write_synthetic_csv(path, n_rows, chunk_size=500000, random_state=0):
+    """
+    Write n_rows generated student records to a CSV one chunk at a time
+    """
+    written = 0
+    chunk_index = 0
+    with open(path + '.tmp', 'w', newline='') as f:
+        while written < n_rows:
+            n_chunk = min(chunk_size, n_rows - written)
+            df = load_and_preprocess_data(n_samples=n_chunk, random_state=random_state + chunk_index)
+            df.to_csv(f, header=chunk_index == 0, index=False)
+            written += n_chunk
+            chunk_index += 1
+    os.replace(path + '.tmp', path)
+    print(f"Wrote {n_rows} synthetic student records to {path} ({os.path.getsize(path) / 2**20:.0f} MB)")
+
+def is_test_row(row_numbers, test_size=0.2, random_state=42):
+    """
+    Deterministic train/test assignment from a hash of the global row number
+    
+    Unlike train_test_split this needs no pass over the whole dataset and
+    gives the same split whatever the chunk size.
+    """
+    hashed = (row_numbers.astype(np.uint64) + np.uint64(random_state)) * np.uint64(0x9E3779B97F4A7C15)
+    return (hashed >> np.uint64(11)).astype(np.float64) / float(1 << 53) < test_size
+
+def encode_to_shards(csv_path, directory, chunk_size=500000, label_column='performance', test_size=0.2,
+                     random_state=42):
+    """
+    Stream a raw CSV into encoded train/test .npy shards of at most chunk_size rows
+    """
+    os.makedirs(directory, exist_ok=True)
+    shards = {'train': [], 'test': []}
+    classes = set()
+    n_rows = 0
+    start = time.perf_counter()
+    for chunk_index, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size)):
+        X = encode_categorical_features(chunk)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        y = chunk[label_column].to_numpy()
+        classes.update(np.unique(y).tolist())
+        test_mask = is_test_row(np.arange(n_rows, n_rows + len(chunk)), test_size, random_state)
+        for split, mask in (('train', ~test_mask), ('test', test_mask)):
+            prefix = f'{split}_{chunk_index:05d}'
+            np.save(os.path.join(directory, f'{prefix}_X.npy'), X[mask])
+            np.save(os.path.join(directory, f'{prefix}_y.npy'), y[mask])
+            shards[split].append({'X': f'{prefix}_X.npy', 'y': f'{prefix}_y.npy', 'rows': int(mask.sum())})
+        n_rows += len(chunk)
+    
+    manifest = {
+        'feature_names': FEATURE_COLUMNS,
+        'label_column': label_column,
+        'classes': sorted(classes),
+        'n_rows': n_rows,
+        'chunk_size': chunk_size,
+        'shards': shards
+    }
+    # Written last, so an interrupted encode is never mistaken for a complete one
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    print(f"Encoded {n_rows} rows into {len(shards['train'])} shards in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+def load_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+def iter_shards(directory, split='train', order=None):
+    """
+    Yield (X, y) per shard of a split, memory-mapped read-only
+    """
+    shards = load_manifest(directory)['shards'][split]
+    for index in (order if order is not None else range(len(shards))):
+        shard = shards[index]
+        if shard['rows'] == 0:
+            continue
+        yield (np.load(os.path.join(directory, shard['X']), mmap_mode='r'),
+               np.load(os.path.join(directory, shard['y']), mmap_mode='r'))
+
+def fit_scaler_streaming(directory):
+    """
+    Fit a StandardScaler on the training shards with partial_fit
+    """
+    from sklearn.preprocessing import StandardScaler
+    scaler = StandardScaler()
+    for X, _ in iter_shards(directory, 'train'):
+        scaler.partial_fit(X)
+    # The shards are bare arrays, so record the columns that serving passes by name
+    scaler.feature_names_in_ = np.asarray(load_manifest(directory)['feature_names'], dtype=object)
+    return scaler
+
+def scale_shard(scaler, X):
+    """
+    Apply the streaming scaler to a bare shard array, as scaler.transform would
+    
+    Calling transform on an array would warn that the scaler was fitted with
+    feature names, once per shard.
+    """
+    return (np.asarray(X, dtype=np.float64) - scaler.mean_) / scaler.scale_
+
+def train_linear_streaming(directory, scaler, epochs=3, alpha=1e-4, random_state=42):
+    """
+    Train a logistic-loss linear model with minibatch partial_fit over the training shards
+    
+    Shards are visited in a fresh random order every epoch; rows within a
+    shard are already in random order.
+    """
+    from sklearn.linear_model import SGDClassifier
+    manifest = load_manifest(directory)
+    model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=random_state)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        for X, y in iter_shards(directory, 'train', order=rng.permutation(len(manifest['shards']['train']))):
+            model.partial_fit(scale_shard(scaler, X), y, classes=manifest['classes'])
+    return model
+
+def _shard_iterator(directory, scaler, cache_prefix):
+    """
+    xgboost DataIter feeding the scaled training shards one at a time
+    """
+    import xgboost as xgb
+    
+    class ShardIterator(xgb.DataIter):
+        def __init__(self):
+            self._shards = [shard for shard in load_manifest(directory)['shards']['train'] if shard['rows']]
+            self._position = 0
+            super().__init__(cache_prefix=cache_prefix)
+        
+        def next(self, input_data):
+            if self._position == len(self._shards):
+                return False
+            shard = self._shards[self._position]
+            self._position += 1
+            X = np.load(os.path.join(directory, shard['X']), mmap_mode='r')
+            y = np.load(os.path.join(directory, shard['y']), mmap_mode='r')
+            input_data(data=scale_shard(scaler, X), label=np.asarray(y))
+            return True
+        
+        def reset(self):
+            self._position = 0
+    
+    return ShardIterator()
+
+def train_xgboost_streaming(directory, scaler, cache_dir=None, num_boost_round=100, n_jobs=None, **params):
+    """
+    Train XGBoost on the training shards through an external-memory DMatrix
+    
+    xgboost pulls the shards through a DataIter, sketches the histogram cuts
+    and pages the quantised data to cache_dir, so training never holds the
+    full matrix. Labels, gradients and predictions still live in memory at
+    roughly 45 bytes per training row, so unlike the linear path peak memory
+    grows slowly with the row count. Returns an XGBClassifier like
+    train_xgboost.
+    """
+    import xgboost as xgb
+    from model_training import classifier_from_booster
+    train_params = {'objective': 'binary:logistic', 'eval_metric': 'logloss', 'tree_method': 'hist',
+                    'max_depth': 6, 'learning_rate': 0.3, 'seed': 42, **params}
+    if n_jobs:
+        train_params['nthread'] = n_jobs
+    with tempfile.TemporaryDirectory(dir=cache_dir) as cache:
+        iterator = _shard_iterator(directory, scaler, os.path.join(cache, 'xgb'))
+        dtrain = xgb.ExtMemQuantileDMatrix(iterator, max_bin=train_params.pop('max_bin', 256))
+        booster = xgb.train(train_params, dtrain, num_boost_round=num_boost_round)
+        del dtrain
+    return classifier_from_booster(booster)
+
+def evaluate_streaming(model, scaler, directory):
+    """
+    Accuracy on the test shards
+    """
+    correct = 0
+    total = 0
+    for X, y in iter_shards(directory, 'test'):
+        correct += int(np.sum(model.predict(scale_shard(scaler, X)) == y))
+        total += len(y)
+    return correct / total if total else float('nan')
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def shard_bytes(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory) if name.endswith('.npy'))
+
+OUT_OF_CORE_TRAINERS = {
+    'linear': train_linear_streaming,
+    'xgboost': train_xgboost_streaming
+}
+
+def train_out_of_core(directory, models=('linear', 'xgboost'), n_jobs=None):
+    """
+    Fit the scaler and train each model by streaming over encoded shards
+    
+    Returns ({model name: StudentPerformancePredictor}, metrics list).
+    """
+    manifest = load_manifest(directory)
+    start = time.perf_counter()
+    scaler = fit_scaler_streaming(directory)
+    print(f"Fitted scaler on {int(scaler.n_samples_seen_)} rows in {time.perf_counter() - start:.1f}s")
+    
+    predictors = {}
+    results = []
+    for name in models:
+        start = time.perf_counter()
+        if name == 'xgboost':
+            model = train_xgboost_streaming(directory, scaler, n_jobs=n_jobs)
+        else:
+            model = OUT_OF_CORE_TRAINERS[name](directory, scaler)
+        fit_seconds = time.perf_counter() - start
+        predictor = StudentPerformancePredictor(model=model, scaler=scaler)
+        predictor.feature_names = list(manifest['feature_names'])
+        predictors[name] = predictor
+        results.append({'model_name': name, 'accuracy': evaluate_streaming(model, scaler, directory),
+                        'fit_seconds': fit_seconds, 'peak_rss_mb': peak_rss_mb()})
+        print(f"{name}: accuracy {results[-1]['accuracy']:.3f}, fit {fit_seconds:.1f}s, "
+              f"peak RSS so far {results[-1]['peak_rss_mb']:.0f} MB")
+    return predictors, results
+
+def main():
+    """
+    Command-line entry point for out-of-core training
+    """
+    parser = argparse.ArgumentParser(description='Train models on a dataset streamed from disk in chunks')
+    parser.add_argument('--csv', required=True, help='Raw student CSV with the feature columns and a label column')
+    parser.add_argument('--generate', type=int, default=None, help='First write this many synthetic rows to --csv')
+    parser.add_argument('--shards', required=True, help='Directory for the encoded shards')
+    parser.add_argument('--chunk-size', type=int, default=500000, help='Rows per shard; bounds peak memory')
+    parser.add_argument('--models', nargs='+', choices=list(OUT_OF_CORE_TRAINERS), default=list(OUT_OF_CORE_TRAINERS))
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--output', help='Directory to save the trained models in')
+    args = parser.parse_args()
+    
+    if args.generate:
+        write_synthetic_csv(args.csv, args.generate, args.chunk_size)
+    if not os.path.exists(os.path.join(args.shards, MANIFEST_FILE)):
+        encode_to_shards(args.csv, args.shards, args.chunk_size)
+    predictors, results = train_out_of_core(args.shards, args.models, args.jobs)
+    
+    print(f"\nDataset: {os.path.getsize(args.csv) / 2**20:.0f} MB CSV, "
+          f"{shard_bytes(args.shards) / 2**20:.0f} MB encoded; peak RSS {peak_rss_mb():.0f} MB")
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for name, predictor in predictors.items():
+            predictor.save_model(os.path.join(args.output, f'{name}.joblib'))
+    return predictors, results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+def make_cache_key(encoded_row, model_fingerprint):
+    """
+    Hash an encoded (unscaled) feature row together with the model fingerprint
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(model_fingerprint).encode('utf-8'))
+    digest.update(encoded_row.tobytes())
+    return digest.digest()
+
+def estimate_result_size(result):
+    """
+    Rough size in bytes of a prediction result dict
+    """
+    size = sys.getsizeof(result)
+    for key, value in result.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, (list, dict)):
+            size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+def copy_result(result):
+    """
+    Copy a cached result so callers cannot mutate its lists (e.g. recommendations)
+    """
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+
+class PredictionCache:
+    """
+    Bounded LRU/TTL cache for prediction results
+    
+    Bounded by max_entries and/or max_bytes; entries older than ttl_seconds
+    are treated as misses. Safe to share between threads.
+    """
+    
+    def __init__(self, max_entries=10000, max_bytes=None, ttl_seconds=None):
+        if max_entries is None and max_bytes is None:
+            raise ValueError("PredictionCache needs max_entries or max_bytes")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key):
+        """
+        Return a copy of the cached result for key, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            result, size, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy_result(result)
+    
+    def put(self, key, result):
+        """
+        Store a result, evicting least recently used entries beyond the caps
+        """
+        result = copy_result(result)
+        size = estimate_result_size(result)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size, time.monotonic())
+            self._bytes += size
+            while ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+                   (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self):
+        """
+        Drop every cached result, keeping the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """
+        Snapshot of the cache counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds
+            }
@@ -1,45 +1,192 @@
+import hashlib
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-import joblib
-from data_preprocessing import encode_categorical_features
+from data_preprocessing import FEATURE_COLUMNS, encode_categorical_features
+from feature_encoder import FeatureEncoder
+from prediction_cache import PredictionCache, make_cache_key
+from model_artifacts import is_artifact, save_artifact, load_artifact
+from tree_engine import FlatTreeEnsemble
+from standalone_scorer import export_scorer
+from instrumentation import PredictionInstrumentation
+from recommendation_rules import RISK_TABLE, RECOMMENDATION_TABLE, risk_level, risk_levels
+
+# Largest batch scored by the flattened engine per FlatTreeEnsemble.kind, from
+# benchmark_tree_engine with 100 trees: the engine's per-row cost overtakes
+# native RandomForest dispatch at about 300 rows, but XGBoost's native
+# predictor already wins above about 12 rows
+TREE_ENGINE_MAX_ROWS = {
+    'random_forest': 256,
+    'xgboost': 8
+}
 
 class StudentPerformancePredictor:
     """
     Student Performance Prediction Engine
     """
     
-    def __init__(self, model=None, scaler=None):
+    def __init__(self, model=None, scaler=None, cache=None, use_tree_engine=True, tree_engine_max_rows=None):
         self.model = model
         self.scaler = scaler
-        self.feature_names = [
-            'attendance_rate', 'study_hours_per_week', 'sleep_duration',
-            'health_status', 'family_support', 'internet_access',
-            'parental_education', 'previous_performance', 'class_participation',
-            'extracurricular_activities'
-        ]
+        self.feature_names = list(FEATURE_COLUMNS)
+        self.cache = cache
+        self.explanation_cache = None
+        self.use_tree_engine = use_tree_engine
+        self.tree_engine_max_rows = tree_engine_max_rows
+        self.model_fingerprint = None
+        self._encoder = None
+        self._compiled = (None, None)
+        self.native_model_path = None
+        self._native = (None, None)
+        self.instrumentation = None
+    
+    def _get_scoring_model(self, n_rows=1):
+        """
+        Model used for scoring: the flattened tree engine for RandomForest/XGBoost, else the model itself
+        
+        The engine wins where per-call framework dispatch dominates; larger
+        batches go to the native C traversal, which is faster per row. The
+        crossover is tree_engine_max_rows if set, else TREE_ENGINE_MAX_ROWS
+        for the ensemble's kind.
+        """
+        if not self.use_tree_engine:
+            return self.model
+        engine = self._get_tree_engine()
+        if not isinstance(engine, FlatTreeEnsemble):
+            return self.model
+        max_rows = self.tree_engine_max_rows
+        if max_rows is None:
+            max_rows = TREE_ENGINE_MAX_ROWS[engine.kind]
+        return engine if n_rows <= max_rows else self._get_native_model()
+    
+    def _get_native_model(self):
+        """
+        The native estimator behind a loaded artifact, read on first use; otherwise the model itself
+        """
+        path = self.native_model_path
+        if path is None:
+            return self.model
+        source, native = self._native
+        if source != path:
+            import joblib
+            native = joblib.load(path)
+            self._native = (path, native)
+        return native
+    
+    def _get_tree_engine(self):
+        """
+        The model flattened into a FlatTreeEnsemble, or the model itself if it is not a tree ensemble
+        """
+        # (source, compiled) swapped as one tuple so concurrent callers never mix them
+        source, compiled = self._compiled
+        if source is not self.model:
+            source = self.model
+            compiled = FlatTreeEnsemble.from_model(source) or source
+            self._compiled = (source, compiled)
+        return compiled
+    
+    def enable_cache(self, max_entries=10000, max_bytes=None, ttl_seconds=None):
+        """
+        Turn on the bounded prediction result cache
+        """
+        self.cache = PredictionCache(max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        return self.cache
+    
+    def enable_instrumentation(self, instrumentation=None):
+        """
+        Turn on per-stage latency histograms, optionally sharing an existing PredictionInstrumentation
+        """
+        self.instrumentation = instrumentation or PredictionInstrumentation()
+        return self.instrumentation
+    
+    def _start_clock(self, operation):
+        instrumentation = self.instrumentation
+        return instrumentation.start(operation) if instrumentation is not None else None
+    
+    def enable_explanation_cache(self, max_entries=10000, max_bytes=None, ttl_seconds=None):
+        """
+        Turn on the bounded cache of per-student explanations
+        """
+        self.explanation_cache = PredictionCache(max_entries=max_entries, max_bytes=max_bytes,
+                                                 ttl_seconds=ttl_seconds)
+        return self.explanation_cache
+    
+    def _model_version(self):
+        """
+        Identifier of the loaded model and scaler, used to scope cache keys
+        """
+        if self.model_fingerprint is not None:
+            return self.model_fingerprint
+        # Models passed in directly have no file to hash, fall back to object identity
+        return f"{id(self.model)}:{id(self.scaler)}"
+    
+    def _cache_key(self, student_data, row=None):
+        """
+        Cache key for a single student, or None when the result cannot be cached
+        
+        row is the student's already encoded (unscaled) row, if the caller has it.
+        """
+        if self.cache is None or not isinstance(student_data, dict):
+            return None
+        if row is None:
+            encoder = self._get_encoder()
+            if encoder is None:
+                return None
+            row = encoder.encode(student_data)
+        return make_cache_key(row, self._model_version())
+    
+    def _get_encoder(self):
+        """
+        Get the precompiled single-row encoder, rebuilding it if the scaler or features changed
+        """
+        encoder = self._encoder
+        if encoder is None or not encoder.matches(self.feature_names, self.scaler):
+            # A fitted scaler means scikit-learn is already loaded, so this import is free
+            from sklearn.preprocessing import StandardScaler
+            if self.scaler is not None and not isinstance(self.scaler, StandardScaler):
+                return None
+            encoder = FeatureEncoder(self.feature_names, self.scaler)
+            self._encoder = encoder
+        return encoder
     
-    def preprocess_input(self, student_data):
+    def preprocess_input(self, student_data, clock=None):
         """
         Preprocess input data for prediction
         """
+        # Single students skip pandas entirely
+        if isinstance(student_data, dict):
+            encoder = self._get_encoder()
+            if encoder is not None:
+                row = encoder.encode(student_data)
+                if clock:
+                    clock.lap('encoding')
+                row = encoder.scale(row)
+                if clock:
+                    clock.lap('scaling')
+                return row
+        
         # Convert to DataFrame
         if isinstance(student_data, dict):
             df = pd.DataFrame([student_data])
         else:
             df = student_data.copy()
+        if clock:
+            clock.lap('dataframe')
         
         # Encode categorical features
         df_encoded = encode_categorical_features(df)
         
         # Select features in correct order
         X = df_encoded[self.feature_names]
+        if clock:
+            clock.lap('encoding')
         
         # Scale features
         if self.scaler:
             X_scaled = self.scaler.transform(X)
         else:
             X_scaled = X.values
+        if clock:
+            clock.lap('scaling')
         
         return X_scaled
     
@@ -50,19 +197,48 @@ class StudentPerformancePredictor:
         if self.model is None:
             raise ValueError("Model not loaded. Please load a trained model first.")
         
+        clock = self._start_clock('predict')
+        # Encode once: the unscaled row keys the cache, then is scaled in place for the model
+        encoder = self._get_encoder() if isinstance(student_data, dict) else None
+        row = None
+        if encoder is not None:
+            row = encoder.encode(student_data)
+            if clock:
+                clock.lap('encoding')
+        cache_key = self._cache_key(student_data, row)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if clock:
+                clock.lap('cache_lookup')
+            if cached is not None:
+                if clock:
+                    clock.finish(type(self.model).__name__)
+                return cached
+        
         # Preprocess input
-        X = self.preprocess_input(student_data)
+        if row is not None:
+            X = encoder.scale(row)
+            if clock:
+                clock.lap('scaling')
+        else:
+            X = self.preprocess_input(student_data, clock)
         
         # Make prediction
-        prediction = self.model.predict(X)[0]
-        probability = self.model.predict_proba(X)[0]
+        model = self._get_scoring_model()
+        prediction, probability = self._score(model, X, clock)
+        prediction = prediction[0]
+        probability = probability[0]
         
         # Calculate confidence and risk level
         confidence = max(probability)
         risk_level = self._calculate_risk_level(student_data, probability)
+        if clock:
+            clock.lap('risk_level')
         
         # Generate recommendations
         recommendations = self._generate_recommendations(student_data)
+        if clock:
+            clock.lap('recommendations')
         
         result = {
             'predicted_performance': 'Pass' if prediction == 1 else 'At Risk',
@@ -72,8 +248,32 @@ class StudentPerformancePredictor:
             'probability_pass': probability[1] if len(probability) > 1 else probability[0]
         }
         
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        if clock:
+            clock.lap('assemble')
+            clock.finish(type(self.model).__name__)
+        
         return result
     
+    @staticmethod
+    def _score(model, X, clock=None):
+        """
+        Labels and class probabilities for preprocessed rows
+        """
+        probability = model.predict_proba(X)
+        if clock:
+            clock.lap('predict_proba')
+        if isinstance(model, FlatTreeEnsemble):
+            # The flattened engine's labels are the argmax of its probabilities, skip a second pass
+            prediction = model.classes_.take(np.argmax(probability, axis=1))
+        else:
+            # SVC's Platt-scaled probabilities can disagree with its labels, so keep predict()
+            prediction = model.predict(X)
+        if clock:
+            clock.lap('predict')
+        return prediction, probability
+    
     def _calculate_risk_level(self, student_data, probability):
         """
         Calculate risk level based on prediction probability and key factors
@@ -81,102 +281,270 @@ class StudentPerformancePredictor:
         prob_pass = probability[1] if len(probability) > 1 else probability[0]
         
         # Consider key risk factors
-        risk_factors = 0
-        
-        if student_data.get('attendance_rate', 100) < 70:
-            risk_factors += 2
-        elif student_data.get('attendance_rate', 100) < 85:
-            risk_factors += 1
-        
-        if student_data.get('study_hours_per_week', 20) < 8:
-            risk_factors += 2
-        elif student_data.get('study_hours_per_week', 20) < 12:
-            risk_factors += 1
-        
-        if student_data.get('previous_performance', 4.0) < 2.0:
-            risk_factors += 2
-        elif student_data.get('previous_performance', 4.0) < 2.5:
-            risk_factors += 1
+        risk_points = sum(RISK_TABLE.payloads[rule_id] for rule_id in RISK_TABLE.matching_rules(student_data))
         
         # Combine probability and risk factors
-        if prob_pass > 0.8 and risk_factors == 0:
-            return 'low'
-        elif prob_pass > 0.6 and risk_factors <= 1:
-            return 'medium'
-        else:
-            return 'high'
+        return risk_level(prob_pass, risk_points)
     
     def _generate_recommendations(self, student_data):
         """
         Generate personalized recommendations based on student data
         """
-        recommendations = []
+        return [RECOMMENDATION_TABLE.payloads[rule_id]
+                for rule_id in RECOMMENDATION_TABLE.matching_rules(student_data)]
+    
+    def batch_predict(self, students_data, chunk_size=10000):
+        """
+        Make predictions for multiple students
         
-        # Attendance recommendations
-        attendance = student_data.get('attendance_rate', 100)
-        if attendance < 70:
-            recommendations.append("Critical: Improve class attendance immediately - aim for at least 85%")
-        elif attendance < 85:
-            recommendations.append("Improve class attendance to at least 85% for better outcomes")
-        else:
-            recommendations.append("Maintain excellent attendance record")
-        
-        # Study hours recommendations
-        study_hours = student_data.get('study_hours_per_week', 20)
-        if study_hours < 8:
-            recommendations.append("Significantly increase study time - aim for 12-15 hours per week")
-        elif study_hours < 12:
-            recommendations.append("Increase weekly study hours to 12-15 for optimal performance")
-        elif study_hours > 25:
-            recommendations.append("Consider reducing study hours to avoid burnout - quality over quantity")
-        else:
-            recommendations.append("Maintain current study schedule")
+        The whole batch is encoded and scaled once and scored with one
+        predict/predict_proba call per chunk, so the per-row DataFrame and
+        model call overhead of predict() is paid once per chunk instead.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Please load a trained model first.")
         
-        # Sleep recommendations
-        sleep = student_data.get('sleep_duration', 8)
-        if sleep < 6:
-            recommendations.append("Critical: Get more sleep - aim for 7-8 hours per night")
-        elif sleep < 7:
-            recommendations.append("Increase sleep duration to 7-8 hours for better cognitive performance")
-        elif sleep > 9:
-            recommendations.append("Consider if excessive sleep indicates underlying health issues")
+        clock = self._start_clock('batch_predict')
+        if self.cache is None or isinstance(students_data, pd.DataFrame):
+            results = self._batch_predict(students_data, chunk_size, clock)
+            if clock:
+                clock.finish(type(self.model).__name__)
+            return results
         
-        # Health and lifestyle
-        health = student_data.get('health_status', 'good')
-        if health in ['poor', 'fair']:
-            recommendations.append("Focus on improving physical health through exercise and proper nutrition")
+        # Serve cached students and score only the misses in one vectorized call
+        students_data = list(students_data)
+        keys = [self._cache_key(student_data) for student_data in students_data]
+        results = [self.cache.get(key) if key is not None else None for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if clock:
+            clock.lap('cache_lookup')
+        if missing:
+            fresh = self._batch_predict([students_data[i] for i in missing], chunk_size, clock)
+            for i, result in zip(missing, fresh):
+                results[i] = result
+                if keys[i] is not None:
+                    self.cache.put(keys[i], result)
+        if clock:
+            clock.finish(type(self.model).__name__)
+        return results
+    
+    def check_students(self, students_data):
+        """
+        Raise KeyError naming the first feature a student record is missing
         
-        # Family support
-        family_support = student_data.get('family_support', 'high')
-        if family_support == 'low':
-            recommendations.append("Seek additional academic support from teachers or tutoring services")
+        A DataFrame built from mixed records would fill the gap with NaN and
+        still score the student, unlike predict(), so batches are checked first.
+        """
+        required = set(self.feature_names)
+        for student_data in students_data:
+            if not required.issubset(student_data):
+                raise KeyError(next(feature for feature in self.feature_names if feature not in student_data))
+    
+    def _score_batch(self, students_data, chunk_size, clock=None):
+        """
+        Encode, scale and score a batch, returning the raw frame, labels, probabilities and scoring model
+        """
+        if isinstance(students_data, pd.DataFrame):
+            df = students_data
+        else:
+            students_data = list(students_data)
+            self.check_students(students_data)
+            df = pd.DataFrame(students_data)
         
-        # Class participation
-        participation = student_data.get('class_participation', 'medium')
-        if participation == 'low':
-            recommendations.append("Increase class participation and engagement with course material")
+        n_students = len(df)
+        if n_students == 0:
+            return df, np.empty(0), np.empty((0, 2)), self.model
         
-        # Previous performance
-        prev_performance = student_data.get('previous_performance', 3.0)
-        if prev_performance < 2.5:
-            recommendations.append("Consider academic counseling to address fundamental learning gaps")
+        # Encode and scale the whole batch at once
+        X = self.preprocess_input(df, clock)
         
-        return recommendations
+        # Score chunk by chunk
+        model = self._get_scoring_model(min(n_students, chunk_size))
+        predictions = []
+        probabilities = []
+        for start in range(0, n_students, chunk_size):
+            prediction_chunk, probability_chunk = self._score(model, X[start:start + chunk_size], clock)
+            predictions.append(prediction_chunk)
+            probabilities.append(probability_chunk)
+        return df, np.concatenate(predictions), np.vstack(probabilities), model
     
-    def batch_predict(self, students_data):
+    def _batch_predict(self, students_data, chunk_size, clock=None):
         """
-        Make predictions for multiple students
+        Vectorized scoring of a batch, bypassing the result cache
         """
+        df, predictions, probabilities, _ = self._score_batch(students_data, chunk_size, clock)
+        if len(df) == 0:
+            return []
+        
+        confidence = probabilities.max(axis=1)
+        prob_pass = probabilities[:, 1] if probabilities.shape[1] > 1 else probabilities[:, 0]
+        levels = risk_levels(prob_pass, RISK_TABLE.total_points(RISK_TABLE.evaluate(df))).tolist()
+        if clock:
+            clock.lap('risk_level')
+        recommendations = RECOMMENDATION_TABLE.render_all(RECOMMENDATION_TABLE.evaluate(df))
+        if clock:
+            clock.lap('recommendations')
+        
         results = []
-        for student_data in students_data:
-            result = self.predict(student_data)
-            results.append(result)
+        for i in range(len(df)):
+            results.append({
+                'predicted_performance': 'Pass' if predictions[i] == 1 else 'At Risk',
+                'confidence': confidence[i],
+                'risk_level': levels[i],
+                'recommendations': recommendations[i],
+                'probability_pass': prob_pass[i]
+            })
+        if clock:
+            clock.lap('assemble')
         return results
     
-    def save_model(self, filepath):
+    def risk_report(self, students_data, chunk_size=10000):
+        """
+        Vectorized risk report for a whole cohort as a DataFrame
+        
+        Recommendations are returned as uint64 bitmasks over
+        RECOMMENDATION_RULES; render them with render_recommendations().
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Please load a trained model first.")
+        
+        df, predictions, probabilities, _ = self._score_batch(students_data, chunk_size)
+        prob_pass = probabilities[:, 1] if probabilities.shape[1] > 1 else probabilities[:, 0]
+        risk_points = RISK_TABLE.total_points(RISK_TABLE.evaluate(df)) if len(df) else np.empty(0, dtype=int)
+        
+        return pd.DataFrame({
+            'predicted_performance': np.where(predictions == 1, 'Pass', 'At Risk'),
+            'probability_pass': prob_pass,
+            'confidence': probabilities.max(axis=1),
+            'risk_points': risk_points,
+            'risk_level': risk_levels(prob_pass, risk_points),
+            'recommendation_mask': RECOMMENDATION_TABLE.evaluate(df) if len(df) else np.empty(0, dtype=np.uint64)
+        }, index=df.index)
+    
+    def _explanation_output(self):
+        """
+        Space the explanations add up in: 'probability' for random forests, 'log_odds' otherwise
+        """
+        engine = self._get_tree_engine()
+        if isinstance(engine, FlatTreeEnsemble):
+            return 'log_odds' if engine.kind == 'xgboost' else 'probability'
+        coef = getattr(self.model, 'coef_', None)
+        if coef is not None and coef.shape[0] == 1:
+            return 'log_odds'
+        raise ValueError(f"Explanations are available for tree and binary linear models, not {type(self.model).__name__}")
+    
+    def _contributions(self, X):
+        """
+        Per-row bias and feature contributions for preprocessed rows
+        """
+        engine = self._get_tree_engine()
+        if isinstance(engine, FlatTreeEnsemble):
+            return engine.contributions(X)
+        # Binary linear model: the log-odds are intercept + sum(coef * scaled value)
+        X = np.asarray(X, dtype=np.float64)
+        return np.full(len(X), float(self.model.intercept_[0])), X * self.model.coef_[0]
+    
+    def explain_batch(self, students_data, chunk_size=10000):
+        """
+        Exact per-student feature contributions for a whole batch, as a DataFrame
+        
+        RandomForest and XGBoost use tree-path attribution, logistic regression
+        uses coefficient x scaled value. base_value plus the feature columns
+        adds up to the 'prediction' column, which is the pass probability for
+        random forests and the log-odds of passing otherwise; the space is
+        recorded in the frame's attrs['output'].
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Please load a trained model first.")
+        output = self._explanation_output()
+        
+        if isinstance(students_data, pd.DataFrame):
+            df = students_data
+        else:
+            students_data = list(students_data)
+            self.check_students(students_data)
+            df = pd.DataFrame(students_data)
+        X = np.asarray(self.preprocess_input(df), dtype=np.float64) if len(df) else np.empty((0, len(self.feature_names)))
+        n_students = len(X)
+        bias = np.empty(n_students)
+        contributions = np.empty((n_students, len(self.feature_names)))
+        
+        # Serve cached rows and explain only the misses, still in vectorized chunks
+        cache = self.explanation_cache
+        missing = np.arange(n_students)
+        keys = None
+        if cache is not None:
+            version = self._model_version()
+            keys = [make_cache_key(X[i], version) for i in range(n_students)]
+            missing = []
+            for i, key in enumerate(keys):
+                cached = cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    bias[i] = cached['base_value']
+                    contributions[i] = cached['contributions']
+            missing = np.asarray(missing, dtype=np.int64)
+        
+        for start in range(0, len(missing), chunk_size):
+            rows = missing[start:start + chunk_size]
+            bias[rows], contributions[rows] = self._contributions(X[rows])
+            if keys is not None:
+                for i in rows.tolist():
+                    cache.put(keys[i], {'base_value': float(bias[i]), 'contributions': contributions[i].tolist()})
+        
+        explanation = pd.DataFrame(contributions, columns=self.feature_names, index=df.index)
+        explanation['base_value'] = bias
+        explanation['prediction'] = bias + contributions.sum(axis=1)
+        explanation.attrs['output'] = output
+        return explanation
+    
+    def explain(self, student_data):
+        """
+        Feature contributions for a single student, largest effect first
+        """
+        explanation = self.explain_batch([student_data])
+        row = explanation.iloc[0]
+        contributions = {feature: float(row[feature]) for feature in self.feature_names}
+        return {
+            'output': explanation.attrs['output'],
+            'base_value': float(row['base_value']),
+            'prediction': float(row['prediction']),
+            'contributions': contributions,
+            'top_factors': sorted(contributions.items(), key=lambda item: abs(item[1]), reverse=True)
+        }
+    
+    @staticmethod
+    def render_recommendations(recommendation_masks):
+        """
+        Turn recommendation bitmasks from risk_report() into message lists
+        """
+        return RECOMMENDATION_TABLE.render_all(recommendation_masks)
+    
+    def save_model(self, filepath, artifact_format='joblib', keep_native=False):
         """
         Save the trained model and scaler
+        
+        artifact_format='mmap' writes a directory artifact whose large arrays
+        are memory-mapped on load and shared between worker processes; tree
+        ensembles are then served by the flat engine, and keep_native=True
+        also stores the native estimator for batches above the engine's
+        crossover, loaded the first time one arrives.
+        artifact_format='standalone' exports a NumPy-only scorer directory
+        for standalone_scorer.load_scorer.
         """
+        if artifact_format == 'mmap':
+            save_artifact(self.model, self.scaler, self.feature_names, filepath, keep_native=keep_native)
+            print(f"Model saved to {filepath}")
+            return
+        if artifact_format == 'standalone':
+            export_scorer(self.model, self.scaler, self.feature_names, filepath)
+            print(f"Standalone scorer exported to {filepath}")
+            return
+        if artifact_format != 'joblib':
+            raise ValueError(f"Unknown artifact format: {artifact_format}")
+        
+        import joblib
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
@@ -188,12 +556,44 @@ class StudentPerformancePredictor:
     def load_model(self, filepath):
         """
         Load a trained model and scaler
+        
+        This replaces the model, scaler and feature names one after another;
+        to reload under concurrent traffic use ModelRegistry, which swaps
+        whole predictors atomically.
         """
-        model_data = joblib.load(filepath)
+        if is_artifact(filepath):
+            model_data = load_artifact(filepath)
+        else:
+            import joblib
+            model_data = joblib.load(filepath)
+        
+        # Fingerprint the artifact so cached results never outlive their model
+        if 'fingerprint' in model_data:
+            fingerprint = model_data['fingerprint']
+        else:
+            fingerprint = self._fingerprint_file(filepath)
+        
         self.model = model_data['model']
+        self.native_model_path = model_data.get('native_model_path')
         self.scaler = model_data['scaler']
         self.feature_names = model_data['feature_names']
+        self.model_fingerprint = fingerprint
+        if self.cache is not None:
+            self.cache.clear()
+        if self.explanation_cache is not None:
+            self.explanation_cache.clear()
         print(f"Model loaded from {filepath}")
+    
+    @staticmethod
+    def _fingerprint_file(filepath, block_size=1 << 20):
+        """
+        SHA-256 of a model file's contents
+        """
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
 
 def main():
     """
@@ -0,0 +1,354 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from prediction_engine import StudentPerformancePredictor
+from model_registry import ModelRegistry
+from instrumentation import PredictionInstrumentation
+
+class MicroBatcher:
+    """
+    Merges concurrent prediction requests into micro-batches for batch_predict
+    
+    A batch is closed when it reaches max_batch_size students or when
+    max_wait_ms has passed since its first request arrived.
+    """
+    
+    def __init__(self, predictor, max_batch_size=256, max_wait_ms=5.0):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._requests = 0
+        self._students = 0
+        self._batches = 0
+        self._failed_requests = 0
+        self._max_batch_seen = 0
+        self._batch_size_counts = {}
+        self._inference_seconds = 0.0
+        self._running = True
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+    
+    def submit(self, students):
+        """
+        Queue a list of student dicts, returning a Future for their prediction results
+        """
+        future = Future()
+        if not self._running:
+            future.set_exception(RuntimeError("Prediction server is shutting down"))
+            return future
+        self._queue.put((list(students), future))
+        return future
+    
+    def predict(self, students, timeout=None):
+        """
+        Submit students and block until their results are ready
+        """
+        return self.submit(students).result(timeout=timeout)
+    
+    def close(self):
+        """
+        Stop the worker after the queued requests have been served
+        """
+        self._running = False
+        self._queue.put(None)
+        self._worker.join()
+    
+    def _collect_batch(self, first):
+        """
+        Gather requests behind the first one until the batch is full or the wait expires
+        """
+        batch = [first]
+        n_students = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while n_students < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the sentinel so the worker loop sees it after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+            n_students += len(item[0])
+        return batch, n_students
+    
+    def _run(self):
+        """
+        Worker loop serving one micro-batch per vectorized inference call
+        """
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, n_students = self._collect_batch(first)
+            
+            # Reject requests with incomplete students up front, so they never reach a merged batch
+            failed = 0
+            valid = []
+            for request_students, future in batch:
+                try:
+                    self.predictor.check_students(request_students)
+                except (KeyError, TypeError) as e:
+                    failed += 1
+                    future.set_exception(e)
+                else:
+                    valid.append((request_students, future))
+            
+            students = [student for request_students, _ in valid for student in request_students]
+            start = time.perf_counter()
+            try:
+                results = self.predictor.batch_predict(students) if students else []
+            except Exception:
+                # One bad request must not fail its neighbours, so fall back per request
+                results = None
+            elapsed = time.perf_counter() - start
+            
+            offset = 0
+            for request_students, future in valid:
+                if results is not None:
+                    future.set_result(results[offset:offset + len(request_students)])
+                else:
+                    try:
+                        future.set_result(self.predictor.batch_predict(request_students))
+                    except Exception as e:
+                        failed += 1
+                        future.set_exception(e)
+                offset += len(request_students)
+            
+            self._record_batch(len(batch), n_students, failed, elapsed)
+    
+    def _record_batch(self, n_requests, n_students, failed, elapsed):
+        """
+        Update the throughput and batch-size statistics
+        """
+        with self._stats_lock:
+            self._requests += n_requests
+            self._students += n_students
+            self._batches += 1
+            self._failed_requests += failed
+            self._inference_seconds += elapsed
+            self._max_batch_seen = max(self._max_batch_seen, n_students)
+            self._batch_size_counts[n_students] = self._batch_size_counts.get(n_students, 0) + 1
+    
+    def stats(self):
+        """
+        Snapshot of throughput, queue depth and batch-size statistics
+        """
+        with self._stats_lock:
+            uptime = time.monotonic() - self._started_at
+            return {
+                'uptime_seconds': uptime,
+                'queue_depth': self._queue.qsize(),
+                'requests': self._requests,
+                'failed_requests': self._failed_requests,
+                'students': self._students,
+                'batches': self._batches,
+                'students_per_second': self._students / uptime if uptime > 0 else 0.0,
+                'mean_batch_size': self._students / self._batches if self._batches else 0.0,
+                'max_batch_size_seen': self._max_batch_seen,
+                'batch_size_counts': {str(size): count for size, count in sorted(self._batch_size_counts.items())},
+                'inference_seconds': self._inference_seconds,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0
+            }
+
+def to_json_value(value):
+    """
+    Convert NumPy scalars in prediction results to plain JSON types
+    """
+    if isinstance(value, dict):
+        return {key: to_json_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints: POST /predict, GET /stats, GET /health
+    
+    With instrumentation enabled, GET /metrics serves per-stage latency
+    histograms in the Prometheus text format.
+    
+    When serving from a ModelRegistry, also GET /versions, POST /activate
+    with {"version": ...} and POST /rollback.
+    """
+    
+    batcher = None
+    request_timeout = 30.0
+    
+    def _send_json(self, status, payload):
+        body = json.dumps(to_json_value(payload)).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_text(self, status, text, content_type='text/plain; version=0.0.4'):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        instrumentation = self.batcher.predictor.instrumentation
+        if self.path == '/health':
+            self._send_json(200, {'success': True, 'status': 'ok'})
+        elif self.path == '/stats':
+            stats = self.batcher.stats()
+            if self.batcher.predictor.cache is not None:
+                stats['cache'] = self.batcher.predictor.cache.stats()
+            if isinstance(self.batcher.predictor, ModelRegistry):
+                stats['active_version'] = self.batcher.predictor.active_version
+            if instrumentation is not None:
+                stats['stages'] = instrumentation.snapshot()
+            self._send_json(200, {'success': True, 'stats': stats})
+        elif self.path == '/metrics' and instrumentation is not None:
+            self._send_text(200, instrumentation.to_prometheus())
+        elif self.path == '/versions' and isinstance(self.batcher.predictor, ModelRegistry):
+            registry = self.batcher.predictor
+            self._send_json(200, {'success': True, 'active': registry.active_version,
+                                  'versions': registry.versions()})
+        else:
+            self._send_json(404, {'success': False, 'message': 'Not found'})
+    
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'success': False, 'message': 'Invalid JSON body'})
+            return
+        
+        if self.path == '/predict':
+            self._handle_predict(payload)
+        elif self.path in ('/activate', '/rollback') and isinstance(self.batcher.predictor, ModelRegistry):
+            self._handle_registry(payload)
+        else:
+            self._send_json(404, {'success': False, 'message': 'Not found'})
+    
+    def _handle_registry(self, payload):
+        registry = self.batcher.predictor
+        try:
+            if self.path == '/rollback':
+                version = registry.rollback()
+            else:
+                # Loads and warms up in the background; traffic keeps hitting the current version
+                registry.activate(payload['version'])
+                version = payload['version']
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {'success': False, 'message': f'Registry operation failed: {e}'})
+            return
+        self._send_json(200, {'success': True, 'version': version, 'active': registry.active_version})
+    
+    def _handle_predict(self, payload):
+        # Accept either {"students": [...]} or a single student object
+        if isinstance(payload, dict) and 'students' in payload:
+            students = payload['students']
+            single = False
+        else:
+            students = [payload]
+            single = True
+        if not isinstance(students, list) or not all(isinstance(s, dict) for s in students):
+            self._send_json(400, {'success': False, 'message': 'Expected a student object or {"students": [...]}'})
+            return
+        
+        try:
+            results = self.batcher.predict(students, timeout=self.request_timeout)
+        except (KeyError, ValueError, TypeError) as e:
+            # Missing features or unusable values in the submitted students
+            self._send_json(400, {'success': False, 'message': f'Invalid student data: {e}'})
+            return
+        except FutureTimeoutError:
+            self._send_json(504, {'success': False,
+                                  'message': f'Prediction timed out after {self.request_timeout:g}s'})
+            return
+        except Exception as e:
+            self._send_json(500, {'success': False, 'message': f'Prediction failed: {e}'})
+            return
+        
+        if single:
+            self._send_json(200, {'success': True, 'prediction': results[0]})
+        else:
+            self._send_json(200, {'success': True, 'predictions': results})
+    
+    def log_message(self, format, *args):
+        # Keep the console quiet under load; statistics are served on /stats
+        pass
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    """
+    Threading HTTP server with a listen backlog sized for bursts of concurrent callers
+    """
+    
+    daemon_threads = True
+    request_queue_size = 1024
+
+def create_server(predictor, host='127.0.0.1', port=8001, max_batch_size=256, max_wait_ms=5.0):
+    """
+    Build a prediction HTTP server around a loaded predictor
+    """
+    batcher = MicroBatcher(predictor, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    handler = type('BoundPredictionRequestHandler', (PredictionRequestHandler,), {'batcher': batcher})
+    server = PredictionHTTPServer((host, port), handler)
+    server.batcher = batcher
+    return server
+
+def main():
+    """
+    Run the local prediction server
+    """
+    parser = argparse.ArgumentParser(description='Serve student performance predictions over HTTP')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--model', help='Path to a model saved with save_model')
+    source.add_argument('--registry', help='ModelRegistry directory; serves its active version')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--cache-entries', type=int, default=0,
+                        help='Cache up to this many prediction results (0 disables the cache)')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Record per-stage latency histograms and serve them on /metrics')
+    args = parser.parse_args()
+    
+    instrumentation = PredictionInstrumentation() if args.metrics else None
+    if args.registry:
+        predictor = ModelRegistry(args.registry, cache_entries=args.cache_entries,
+                                  instrumentation=instrumentation)
+        predictor.load_active()
+    else:
+        predictor = StudentPerformancePredictor()
+        if args.cache_entries > 0:
+            predictor.enable_cache(max_entries=args.cache_entries)
+        predictor.load_model(args.model)
+        predictor.instrumentation = instrumentation
+    
+    server = create_server(predictor, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    print(f"Prediction server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+
+if __name__ == "__main__":
+    main()
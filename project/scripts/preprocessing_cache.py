@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# Bump when the preprocessing code changes in a way that alters its outputs
+PREPROCESSING_VERSION = 2
+META_FILE = 'meta.json'
+ARRAY_KEYS = ['X_train', 'X_test', 'y_train', 'y_test']
+
+def default_cache_dir():
+    return os.environ.get('PREPROCESSING_CACHE_DIR',
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'preprocessing'))
+
+def preprocessing_key(df, params):
+    """
+    Content hash of a raw DataFrame plus the preprocessing parameters
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'version': PREPROCESSING_VERSION, 'params': params}, sort_keys=True,
+                             default=str).encode('utf-8'))
+    digest.update(json.dumps([[str(column), str(dtype)] for column, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+class PreprocessingCache:
+    """
+    On-disk, content-addressed cache of preprocessing outputs
+    
+    Each entry is a directory named by preprocessing_key() holding the
+    train/test matrices as .npy files, the encoded frame as a pickle and the
+    fitted scaler. Entries are written to a temporary directory and renamed
+    into place, so readers never see a partial entry. Once the cache grows
+    past max_bytes, the least recently used entries are evicted.
+    """
+    
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def _entry_dir(self, key):
+        return os.path.join(self.directory, key)
+    
+    def get(self, key):
+        """
+        Cached preprocessing outputs for key, or None on a miss
+        """
+        import joblib
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, META_FILE)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            data = {name: np.load(os.path.join(entry_dir, f'{name}.npy'), allow_pickle=False) for name in ARRAY_KEYS}
+            data['df_encoded'] = pd.read_pickle(os.path.join(entry_dir, 'encoded.pkl'))
+            data['scaler'] = joblib.load(os.path.join(entry_dir, 'scaler.joblib'))
+        except (OSError, ValueError):
+            # Missing or evicted underneath us
+            return None
+        data['feature_names'] = meta['feature_names']
+        # y was a Series before caching; give it back its name and index
+        for name in ['y_train', 'y_test']:
+            data[name] = pd.Series(data[name], index=meta[f'{name}_index'], name=meta['target_name'])
+        os.utime(meta_path)
+        return data
+    
+    def put(self, key, data):
+        """
+        Store preprocessing outputs under key, then evict down to max_bytes
+        """
+        import joblib
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+        try:
+            for name in ARRAY_KEYS:
+                np.save(os.path.join(tmp_dir, f'{name}.npy'), np.asarray(data[name]), allow_pickle=False)
+            data['df_encoded'].to_pickle(os.path.join(tmp_dir, 'encoded.pkl'))
+            joblib.dump(data['scaler'], os.path.join(tmp_dir, 'scaler.joblib'))
+            with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+                json.dump({
+                    'feature_names': list(data['feature_names']),
+                    'target_name': getattr(data['y_train'], 'name', None),
+                    'y_train_index': np.asarray(getattr(data['y_train'], 'index', range(len(data['y_train'])))).tolist(),
+                    'y_test_index': np.asarray(getattr(data['y_test'], 'index', range(len(data['y_test'])))).tolist(),
+                    'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+                }, f)
+            try:
+                os.rename(tmp_dir, self._entry_dir(key))
+            except OSError:
+                # Another run stored the same key first; its content is identical
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self.evict()
+    
+    def entries(self):
+        """
+        (key, size in bytes, last used timestamp) of every complete entry, least recently used first
+        """
+        entries = []
+        for key in os.listdir(self.directory):
+            meta_path = os.path.join(self._entry_dir(key), META_FILE)
+            if key.startswith('.') or not os.path.exists(meta_path):
+                continue
+            entries.append((key, _directory_size(self._entry_dir(key)), os.path.getmtime(meta_path)))
+        return sorted(entries, key=lambda entry: entry[2])
+    
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        """
+        if self.max_bytes is None:
+            return []
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            evicted.append(key)
+        return evicted
+    
+    def invalidate(self, key=None):
+        """
+        Remove one entry, or every entry when key is None
+        """
+        keys = [key] if key is not None else [entry[0] for entry in self.entries()]
+        for entry_key in keys:
+            shutil.rmtree(self._entry_dir(entry_key), ignore_errors=True)
+        return keys
+    
+    def stats(self):
+        entries = self.entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'directory': self.directory
+        }
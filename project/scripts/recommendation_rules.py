@@ -0,0 +1,199 @@
+import operator
+import numpy as np
+import pandas as pd
+
+# Within a group the first matching rule wins, mirroring an if/elif chain.
+# An 'else' rule matches whenever no earlier rule of its group did.
+
+# (group, feature, operator, threshold, points)
+RISK_RULES = [
+    ('attendance', 'attendance_rate', '<', 70, 2),
+    ('attendance', 'attendance_rate', '<', 85, 1),
+    ('study_hours', 'study_hours_per_week', '<', 8, 2),
+    ('study_hours', 'study_hours_per_week', '<', 12, 1),
+    ('previous_performance', 'previous_performance', '<', 2.0, 2),
+    ('previous_performance', 'previous_performance', '<', 2.5, 1),
+]
+
+# Values assumed for features missing from a student record
+RISK_DEFAULTS = {
+    'attendance_rate': 100,
+    'study_hours_per_week': 20,
+    'previous_performance': 4.0
+}
+
+# (level, minimum probability of passing (exclusive), maximum risk points), checked in order
+RISK_LEVELS = [
+    ('low', 0.8, 0),
+    ('medium', 0.6, 1),
+]
+DEFAULT_RISK_LEVEL = 'high'
+
+# (group, feature, operator, threshold, message)
+RECOMMENDATION_RULES = [
+    ('attendance', 'attendance_rate', '<', 70,
+     "Critical: Improve class attendance immediately - aim for at least 85%"),
+    ('attendance', 'attendance_rate', '<', 85,
+     "Improve class attendance to at least 85% for better outcomes"),
+    ('attendance', 'attendance_rate', 'else', None,
+     "Maintain excellent attendance record"),
+    ('study_hours', 'study_hours_per_week', '<', 8,
+     "Significantly increase study time - aim for 12-15 hours per week"),
+    ('study_hours', 'study_hours_per_week', '<', 12,
+     "Increase weekly study hours to 12-15 for optimal performance"),
+    ('study_hours', 'study_hours_per_week', '>', 25,
+     "Consider reducing study hours to avoid burnout - quality over quantity"),
+    ('study_hours', 'study_hours_per_week', 'else', None,
+     "Maintain current study schedule"),
+    ('sleep', 'sleep_duration', '<', 6,
+     "Critical: Get more sleep - aim for 7-8 hours per night"),
+    ('sleep', 'sleep_duration', '<', 7,
+     "Increase sleep duration to 7-8 hours for better cognitive performance"),
+    ('sleep', 'sleep_duration', '>', 9,
+     "Consider if excessive sleep indicates underlying health issues"),
+    ('health', 'health_status', 'in', ('poor', 'fair'),
+     "Focus on improving physical health through exercise and proper nutrition"),
+    ('family_support', 'family_support', '==', 'low',
+     "Seek additional academic support from teachers or tutoring services"),
+    ('participation', 'class_participation', '==', 'low',
+     "Increase class participation and engagement with course material"),
+    ('previous_performance', 'previous_performance', '<', 2.5,
+     "Consider academic counseling to address fundamental learning gaps"),
+]
+
+RECOMMENDATION_DEFAULTS = {
+    'attendance_rate': 100,
+    'study_hours_per_week': 20,
+    'sleep_duration': 8,
+    'health_status': 'good',
+    'family_support': 'high',
+    'class_participation': 'medium',
+    'previous_performance': 3.0
+}
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+    'in': lambda values, options: values in options,
+    'else': lambda values, threshold: True
+}
+
+ARRAY_OPERATORS = dict(OPERATORS)
+ARRAY_OPERATORS['in'] = lambda values, options: np.isin(values, list(options))
+ARRAY_OPERATORS['else'] = lambda values, threshold: np.ones(len(values), dtype=bool)
+
+class RuleTable:
+    """
+    Declarative rule table compiled for single records and whole batches
+    
+    Each rule has an integer ID (its position in the table). Batch
+    evaluation returns one uint64 bitmask per student with the bits of the
+    rules that fired, so payloads (points or messages) are looked up only
+    when needed.
+    """
+    
+    def __init__(self, rules, defaults):
+        if len(rules) > 64:
+            raise ValueError("A rule table is limited to 64 rules per bitmask")
+        self.rules = list(rules)
+        self.defaults = dict(defaults)
+        self.payloads = [rule[4] for rule in self.rules]
+        
+        # Rules grouped in table order; each entry is (rule_id, feature, operator name, threshold)
+        self.groups = {}
+        for rule_id, (group, feature, op, threshold, _) in enumerate(self.rules):
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown rule operator: {op}")
+            self.groups.setdefault(group, []).append((rule_id, feature, op, threshold))
+        
+        self.features = sorted({rule[1] for rule in self.rules})
+    
+    def matching_rules(self, record):
+        """
+        IDs of the rules that fire for a single record dict, in table order
+        """
+        fired = []
+        for group_rules in self.groups.values():
+            for rule_id, feature, op, threshold in group_rules:
+                if OPERATORS[op](record.get(feature, self.defaults.get(feature)), threshold):
+                    fired.append(rule_id)
+                    break
+        return sorted(fired)
+    
+    def _column(self, data, feature, n_rows):
+        if feature in data:
+            column = data[feature]
+            return column.to_numpy() if isinstance(column, pd.Series) else np.asarray(column)
+        return np.full(n_rows, self.defaults.get(feature))
+    
+    def evaluate(self, data):
+        """
+        uint64 bitmask of fired rules per row of a DataFrame (or dict of columns)
+        """
+        n_rows = len(data) if isinstance(data, pd.DataFrame) else len(next(iter(data.values())))
+        columns = {feature: self._column(data, feature, n_rows) for feature in self.features}
+        
+        masks = np.zeros(n_rows, dtype=np.uint64)
+        for group_rules in self.groups.values():
+            unmatched = np.ones(n_rows, dtype=bool)
+            for rule_id, feature, op, threshold in group_rules:
+                fired = unmatched & ARRAY_OPERATORS[op](columns[feature], threshold)
+                masks |= fired.astype(np.uint64) << np.uint64(rule_id)
+                unmatched &= ~fired
+        return masks
+    
+    def rule_matrix(self, masks):
+        """
+        Boolean (n_rows, n_rules) matrix of fired rules from bitmasks
+        """
+        bits = np.uint64(1) << np.arange(len(self.rules), dtype=np.uint64)
+        return (np.asarray(masks, dtype=np.uint64)[:, np.newaxis] & bits) != 0
+    
+    def total_points(self, masks):
+        """
+        Sum of the numeric payloads of the fired rules per row
+        """
+        return self.rule_matrix(masks) @ np.asarray(self.payloads)
+    
+    def render(self, mask):
+        """
+        Payloads of the rules set in one bitmask, in table order
+        """
+        mask = int(mask)
+        return [payload for rule_id, payload in enumerate(self.payloads) if mask >> rule_id & 1]
+    
+    def render_all(self, masks):
+        """
+        Payload lists for a batch of bitmasks, rendering each distinct mask once
+        """
+        rendered = {}
+        results = []
+        for mask in np.asarray(masks, dtype=np.uint64).tolist():
+            if mask not in rendered:
+                rendered[mask] = self.render(mask)
+            results.append(list(rendered[mask]))
+        return results
+
+RISK_TABLE = RuleTable(RISK_RULES, RISK_DEFAULTS)
+RECOMMENDATION_TABLE = RuleTable(RECOMMENDATION_RULES, RECOMMENDATION_DEFAULTS)
+
+def risk_level(prob_pass, risk_points):
+    """
+    Risk level for a single student from the pass probability and risk points
+    """
+    for level, min_prob_pass, max_points in RISK_LEVELS:
+        if prob_pass > min_prob_pass and risk_points <= max_points:
+            return level
+    return DEFAULT_RISK_LEVEL
+
+def risk_levels(prob_pass, risk_points):
+    """
+    Vectorized risk_level over arrays of pass probabilities and risk points
+    """
+    conditions = [(prob_pass > min_prob_pass) & (risk_points <= max_points)
+                  for _, min_prob_pass, max_points in RISK_LEVELS]
+    return np.select(conditions, [level for level, _, _ in RISK_LEVELS], DEFAULT_RISK_LEVEL)
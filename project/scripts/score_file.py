@@ -0,0 +1,138 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from prediction_engine import StudentPerformancePredictor
+
+_worker_predictor = None
+
+def file_format(path):
+    """
+    'parquet' or 'csv' from a file extension
+    """
+    return 'parquet' if os.path.splitext(path)[1].lower() in ('.parquet', '.pq') else 'csv'
+
+def read_chunks(path, chunk_size):
+    """
+    Yield the input file as DataFrames of at most chunk_size rows
+    """
+    if file_format(path) == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+def score_chunk(predictor, chunk, render_recommendations=False):
+    """
+    Score one chunk and append the prediction columns to it
+    """
+    report = predictor.risk_report(chunk)
+    scored = chunk.copy()
+    for column in report.columns:
+        scored[column] = report[column].to_numpy()
+    if render_recommendations:
+        messages = predictor.render_recommendations(report['recommendation_mask'])
+        scored['recommendations'] = [' | '.join(student_messages) for student_messages in messages]
+    return scored
+
+def _init_worker(model_path):
+    global _worker_predictor
+    _worker_predictor = StudentPerformancePredictor()
+    _worker_predictor.load_model(model_path)
+
+def _score_in_worker(chunk, render_recommendations):
+    return score_chunk(_worker_predictor, chunk, render_recommendations)
+
+class ChunkWriter:
+    """
+    Appends scored chunks to a CSV or Parquet file as they arrive
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.format = file_format(path)
+        self._parquet_writer = None
+        self._wrote_header = False
+    
+    def write(self, chunk):
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='a' if self._wrote_header else 'w',
+                         header=not self._wrote_header, index=False)
+            self._wrote_header = True
+    
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+def score_file(model_path, input_path, output_path, chunk_size=50000, workers=0,
+               render_recommendations=False):
+    """
+    Stream an input file through the predictor chunk by chunk
+    
+    With workers > 0, chunks are scored in a process pool; at most
+    2 * workers chunks are in flight and results are written in input
+    order, so memory stays bounded by the chunk size.
+    """
+    chunks = read_chunks(input_path, chunk_size)
+    writer = ChunkWriter(output_path)
+    n_rows = 0
+    start = time.perf_counter()
+    
+    try:
+        if workers > 0:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path,)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_score_in_worker, chunk, render_recommendations))
+                    if len(pending) >= 2 * workers:
+                        scored = pending.popleft().result()
+                        writer.write(scored)
+                        n_rows += len(scored)
+                while pending:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    n_rows += len(scored)
+        else:
+            predictor = StudentPerformancePredictor()
+            predictor.load_model(model_path)
+            for chunk in chunks:
+                scored = score_chunk(predictor, chunk, render_recommendations)
+                writer.write(scored)
+                n_rows += len(scored)
+    finally:
+        writer.close()
+    
+    elapsed = time.perf_counter() - start
+    print(f"Scored {n_rows} students in {elapsed:.1f}s ({n_rows / elapsed if elapsed else 0:,.0f} rows/sec)")
+    return n_rows
+
+def main():
+    """
+    Command-line entry point for scoring large student files
+    """
+    parser = argparse.ArgumentParser(description='Score a CSV or Parquet file of students in bounded memory')
+    parser.add_argument('input', help='Input .csv or .parquet file with raw student features')
+    parser.add_argument('output', help='Output .csv or .parquet file')
+    parser.add_argument('--model', required=True, help='Path to a model saved with save_model')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Score chunks in this many processes (0 scores in-process)')
+    parser.add_argument('--recommendations', action='store_true',
+                        help='Also render recommendation messages next to the bitmask')
+    args = parser.parse_args()
+    
+    score_file(args.model, args.input, args.output, args.chunk_size, args.workers, args.recommendations)
+
+if __name__ == "__main__":
+    main()
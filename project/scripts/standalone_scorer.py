@@ -0,0 +1,192 @@
+import json
+import os
+import numpy as np
+from tree_engine import FlatTreeEnsemble
+
+# Runtime dependencies are NumPy and tree_engine only; the export step imports
+# the training-side modules lazily so loading a scorer stays fast.
+
+SCORER_FORMAT_VERSION = 1
+SCORER_FILE = 'scorer.json'
+
+def _save_arrays(directory, arrays, prefix=''):
+    files = {}
+    for name, array in arrays.items():
+        filename = f'{prefix}{name}.npy'
+        np.save(os.path.join(directory, filename), np.ascontiguousarray(array))
+        files[name] = filename
+    return files
+
+def _has_logistic_link(model):
+    """
+    Check whether predict_proba is the expit/softmax of the decision function the scorer reproduces
+    """
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    if isinstance(model, LogisticRegression):
+        return True
+    # SGDClassifier normalizes one-vs-rest probabilities for more than two classes, not softmax
+    return isinstance(model, SGDClassifier) and model.loss == 'log_loss' and len(model.classes_) == 2
+
+def export_scorer(model, scaler, feature_names, directory):
+    """
+    Export a trained model, its scaler and the encoding table as a NumPy-only scorer
+    
+    Supports LogisticRegression, binary SGDClassifier(loss='log_loss'),
+    RandomForest and binary XGBoost. Load the result with load_scorer().
+    """
+    from data_preprocessing import ORDINAL_MAPPINGS, BINARY_FEATURES
+    os.makedirs(directory, exist_ok=True)
+    
+    encoding = []
+    for feature in feature_names:
+        if feature in ORDINAL_MAPPINGS:
+            encoding.append({'feature': feature, 'type': 'ordinal',
+                             'mapping': {key: float(value) for key, value in ORDINAL_MAPPINGS[feature].items()}})
+        elif feature in BINARY_FEATURES:
+            encoding.append({'feature': feature, 'type': 'binary', 'positive': BINARY_FEATURES[feature]})
+        else:
+            encoding.append({'feature': feature, 'type': 'numeric'})
+    
+    spec = {
+        'format_version': SCORER_FORMAT_VERSION,
+        'feature_names': list(feature_names),
+        'encoding': encoding,
+        'scaler': {}
+    }
+    
+    # StandardScaler as an affine transform, honouring with_mean/with_std
+    if scaler is not None:
+        scaler_arrays = {}
+        if getattr(scaler, 'with_mean', True):
+            scaler_arrays['mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, 'with_std', True):
+            scaler_arrays['scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+        spec['scaler'] = _save_arrays(directory, scaler_arrays, prefix='scaler_')
+    
+    ensemble = FlatTreeEnsemble.from_model(model)
+    if ensemble is not None:
+        spec['model'] = {
+            'type': 'tree_ensemble',
+            'ensemble': ensemble.metadata(),
+            'arrays': _save_arrays(directory, ensemble.arrays(), prefix='tree_')
+        }
+    elif _has_logistic_link(model):
+        spec['model'] = {
+            'type': 'linear',
+            'classes': model.classes_.tolist(),
+            'arrays': _save_arrays(directory, {
+                'coef': np.asarray(model.coef_, dtype=np.float64),
+                'intercept': np.asarray(model.intercept_, dtype=np.float64)
+            }, prefix='linear_')
+        }
+    else:
+        raise ValueError(f"{type(model).__name__} cannot be exported as a standalone scorer")
+    
+    # Written last, so a half-exported directory is never loadable
+    spec_path = os.path.join(directory, SCORER_FILE)
+    with open(spec_path + '.tmp', 'w') as f:
+        json.dump(spec, f, indent=2)
+    os.replace(spec_path + '.tmp', spec_path)
+    return spec
+
+class StandaloneScorer:
+    """
+    Encodes raw student dicts, scales them and scores them with NumPy only
+    
+    Probabilities match StudentPerformancePredictor on the same model:
+    linear models apply the same expit/softmax of X @ coef.T + intercept
+    as scikit-learn (equal up to the last bit of the expit rounding), and
+    tree models use the flattened tree engine.
+    """
+    
+    def __init__(self, spec, arrays):
+        self.feature_names = spec['feature_names']
+        self._columns = []
+        for column in spec['encoding']:
+            if column['type'] == 'ordinal':
+                self._columns.append((column['feature'], column['mapping'], False))
+            elif column['type'] == 'binary':
+                self._columns.append((column['feature'], {column['positive']: 1.0}, True))
+            else:
+                self._columns.append((column['feature'], None, False))
+        
+        self._mean = arrays.get('scaler_mean')
+        self._scale = arrays.get('scaler_scale')
+        
+        model_spec = spec['model']
+        self.model_type = model_spec['type']
+        if self.model_type == 'tree_ensemble':
+            self._ensemble = FlatTreeEnsemble.from_arrays(
+                model_spec['ensemble'], {name: arrays[f'tree_{name}'] for name in FlatTreeEnsemble.ARRAY_NAMES})
+            self.classes_ = self._ensemble.classes_
+        else:
+            self._coef = arrays['linear_coef']
+            self._intercept = arrays['linear_intercept']
+            self.classes_ = np.asarray(model_spec['classes'])
+    
+    def transform(self, students_data):
+        """
+        Encode and scale a student dict or a list of them into an (n, n_features) matrix
+        """
+        if isinstance(students_data, dict):
+            students_data = [students_data]
+        X = np.empty((len(students_data), len(self._columns)), dtype=np.float64)
+        for row, student_data in enumerate(students_data):
+            values = X[row]
+            for i, (feature, lookup, is_binary) in enumerate(self._columns):
+                value = student_data[feature]
+                if lookup is None:
+                    values[i] = value
+                elif is_binary:
+                    values[i] = lookup.get(value, 0.0)
+                else:
+                    # Unknown categories become NaN, as Series.map does
+                    values[i] = lookup.get(value, np.nan)
+        if self._mean is not None:
+            X -= self._mean
+        if self._scale is not None:
+            X /= self._scale
+        return X
+    
+    def predict_proba(self, students_data):
+        """
+        Class probabilities for a student dict or a list of them
+        """
+        X = self.transform(students_data)
+        if self.model_type == 'tree_ensemble':
+            return self._ensemble.predict_proba(X)
+        
+        if np.isnan(X).any():
+            raise ValueError("Input contains NaN, which linear models cannot score")
+        scores = X @ self._coef.T + self._intercept
+        if self._coef.shape[0] == 1:
+            prob_pass = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - prob_pass, prob_pass])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+    
+    def predict(self, students_data):
+        """
+        Class labels from the highest probability
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(students_data), axis=1))
+
+def load_scorer(directory, mmap=True):
+    """
+    Load a scorer written by export_scorer, memory-mapping its arrays by default
+    """
+    with open(os.path.join(directory, SCORER_FILE)) as f:
+        spec = json.load(f)
+    if spec.get('format_version') != SCORER_FORMAT_VERSION:
+        raise ValueError(f"Unsupported scorer format: {spec.get('format_version')}")
+    
+    files = {f'scaler_{name}': filename for name, filename in spec['scaler'].items()}
+    prefix = 'tree_' if spec['model']['type'] == 'tree_ensemble' else 'linear_'
+    files.update({f'{prefix}{name}': filename for name, filename in spec['model']['arrays'].items()})
+    arrays = {
+        name: np.load(os.path.join(directory, filename), mmap_mode='r' if mmap else None)
+        for name, filename in files.items()
+    }
+    return StandaloneScorer(spec, arrays)
@@ -0,0 +1,427 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Training runs in worker processes, so the runner and its HTTP server stay
+# responsive while jobs train; everything works offline on the local disk.
+
+JOB_FILE = 'job.json'
+EVENTS_FILE = 'events.jsonl'
+TERMINAL_STATUSES = {'completed', 'failed', 'cancelled'}
+# Next to the scripts rather than the working directory, and gitignored
+DEFAULT_JOBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'training_jobs')
+
+def _now():
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
+
+def _write_json(path, payload):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+def read_job(job_dir):
+    with open(os.path.join(job_dir, JOB_FILE)) as f:
+        return json.load(f)
+
+def read_events(job_dir, since=0):
+    """
+    Progress events of a job from sequence number since onwards
+    """
+    events = []
+    path = os.path.join(job_dir, EVENTS_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    # The last event is still being written
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event['seq'] >= since:
+                    events.append(event)
+    return events
+
+class EventLog:
+    """
+    Appends numbered events to a job's events.jsonl
+    
+    Each event goes out in a single os.write on an O_APPEND descriptor, so
+    a process killed while recording never leaves half a line for the next
+    writer to append onto. Existing events are counted once, on creation.
+    """
+    
+    def __init__(self, job_dir):
+        self.path = os.path.join(job_dir, EVENTS_FILE)
+        self.seq = 0
+        # Set when an older writer died mid-line, so the next event starts on a fresh line
+        self._terminate_line = False
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if line.endswith(b'\n'):
+                        self.seq += 1
+                    else:
+                        self._terminate_line = True
+    
+    def append(self, event_type, **fields):
+        line = json.dumps({'seq': self.seq, 'time': _now(), 'type': event_type, **fields}) + '\n'
+        if self._terminate_line:
+            line = '\n' + line
+            self._terminate_line = False
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+        finally:
+            os.close(fd)
+        self.seq += 1
+
+def run_job(job_dir):
+    """
+    Train the job's models one by one in this process, recording progress as it goes
+    
+    Runs inside the worker process started by TrainingJobRunner.
+    """
+    import joblib
+    from model_training import MODEL_TRAINERS, evaluate_model
+    from data_preprocessing import main as preprocess_data
+    
+    job = read_job(job_dir)
+    events = EventLog(job_dir)
+    job['status'] = 'running'
+    job['started_at'] = _now()
+    _write_json(os.path.join(job_dir, JOB_FILE), job)
+    events.append('job_started')
+    start = time.perf_counter()
+    try:
+        data = preprocess_data()
+        trained = {}
+        for model_name in job['params']['models']:
+            job['models'][model_name]['status'] = 'training'
+            _write_json(os.path.join(job_dir, JOB_FILE), job)
+            events.append('model_started', model=model_name)
+            
+            fit_start = time.perf_counter()
+            model = MODEL_TRAINERS[model_name](data['X_train'], data['y_train'], n_jobs=job['params']['n_jobs'])
+            metrics = evaluate_model(model, data['X_test'], data['y_test'], model_name)
+            metrics['fit_seconds'] = time.perf_counter() - fit_start
+            metrics = {key: float(value) if key != 'model_name' else value for key, value in metrics.items()}
+            trained[model_name] = (model, metrics['accuracy'])
+            
+            job['models'][model_name].update(metrics, status='completed')
+            _write_json(os.path.join(job_dir, JOB_FILE), job)
+            events.append('model_finished', model=model_name, metrics=metrics)
+        
+        best_model = max(trained, key=lambda name: trained[name][1])
+        model_path = os.path.join(job_dir, 'model.joblib')
+        joblib.dump({'model': trained[best_model][0], 'scaler': data['scaler'],
+                     'feature_names': data['feature_names']}, model_path)
+        job.update(status='completed', best_model=best_model, model_path=model_path, finished_at=_now(),
+                   training_seconds=time.perf_counter() - start)
+        _write_json(os.path.join(job_dir, JOB_FILE), job)
+        events.append('job_completed', best_model=best_model)
+    except Exception as e:
+        job.update(status='failed', error=f'{type(e).__name__}: {e}', finished_at=_now())
+        _write_json(os.path.join(job_dir, JOB_FILE), job)
+        events.append('job_failed', error=job['error'])
+        raise
+
+class TrainingJobRunner:
+    """
+    Queue of training jobs, each run in its own worker process
+    
+    At most max_concurrent jobs train at once; the rest wait in submission
+    order. Every job lives in its own directory under directory with a
+    job.json status document (rewritten atomically as models finish) and an
+    append-only events.jsonl progress log, so callers can poll either one
+    and results survive restarts. Jobs still queued when the runner stopped
+    are queued again on start; jobs that were running are marked failed.
+    """
+    
+    def __init__(self, directory=DEFAULT_JOBS_DIR, max_concurrent=1, poll_interval=0.2):
+        self.directory = os.path.abspath(directory)
+        self.max_concurrent = max_concurrent
+        self.poll_interval = poll_interval
+        os.makedirs(self.directory, exist_ok=True)
+        # Imported once up front so submitting a job never waits for the ML stack
+        from model_training import MODEL_TRAINERS
+        self.model_names = list(MODEL_TRAINERS)
+        self._lock = threading.Condition()
+        self._queue = deque()
+        self._processes = {}
+        self._running = True
+        self._recover()
+        self._dispatcher = threading.Thread(target=self._dispatch, name='training-jobs', daemon=True)
+        self._dispatcher.start()
+    
+    def _job_dir(self, job_id):
+        # Job IDs are generated here; anything else is not a job
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            raise KeyError(job_id)
+        job_dir = os.path.join(self.directory, job_id)
+        if not os.path.exists(os.path.join(job_dir, JOB_FILE)):
+            raise KeyError(job_id)
+        return job_dir
+    
+    def _recover(self):
+        jobs = []
+        for job_id in os.listdir(self.directory):
+            job_dir = os.path.join(self.directory, job_id)
+            if os.path.exists(os.path.join(job_dir, JOB_FILE)):
+                jobs.append(read_job(job_dir))
+        for job in sorted(jobs, key=lambda job: job['created_at']):
+            if job['status'] == 'queued':
+                self._queue.append(job['id'])
+            elif job['status'] == 'running':
+                self._finish(job['id'], 'failed', 'Interrupted by a runner restart')
+    
+    def submit(self, models=None, n_jobs=None):
+        """
+        Queue a training job and return its job document immediately
+        """
+        models = list(models or self.model_names)
+        unknown = [name for name in models if name not in self.model_names]
+        if unknown:
+            raise ValueError(f"Unknown models: {', '.join(unknown)}")
+        
+        job_id = uuid.uuid4().hex[:16]
+        job_dir = os.path.join(self.directory, job_id)
+        os.makedirs(job_dir)
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'params': {'models': models, 'n_jobs': n_jobs},
+            'created_at': _now(),
+            'started_at': None,
+            'finished_at': None,
+            'models': {name: {'name': name, 'status': 'pending'} for name in models},
+            'best_model': None,
+            'error': None
+        }
+        _write_json(os.path.join(job_dir, JOB_FILE), job)
+        EventLog(job_dir).append('job_queued')
+        with self._lock:
+            self._queue.append(job_id)
+            self._lock.notify()
+        return job
+    
+    def get(self, job_id):
+        return read_job(self._job_dir(job_id))
+    
+    def events(self, job_id, since=0):
+        return read_events(self._job_dir(job_id), since)
+    
+    def list_jobs(self):
+        jobs = []
+        for job_id in os.listdir(self.directory):
+            if os.path.exists(os.path.join(self.directory, job_id, JOB_FILE)):
+                jobs.append(read_job(os.path.join(self.directory, job_id)))
+        return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+    
+    def cancel(self, job_id):
+        """
+        Cancel a queued job, or stop a running one's worker process
+        """
+        job_dir = self._job_dir(job_id)
+        with self._lock:
+            if job_id in self._queue:
+                self._queue.remove(job_id)
+                self._finish(job_id, 'cancelled')
+                return True
+            process = self._processes.pop(job_id, None)
+        if process is None:
+            return False
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        # A job that finished just before the signal keeps its result
+        if read_job(job_dir)['status'] not in TERMINAL_STATUSES:
+            self._finish(job_id, 'cancelled')
+        return True
+    
+    def _finish(self, job_id, status, error=None):
+        job_dir = os.path.join(self.directory, job_id)
+        job = read_job(job_dir)
+        job.update(status=status, error=error, finished_at=_now())
+        _write_json(os.path.join(job_dir, JOB_FILE), job)
+        EventLog(job_dir).append(f'job_{status}', **({'error': error} if error else {}))
+    
+    def _start(self, job_id):
+        job_dir = os.path.join(self.directory, job_id)
+        log = open(os.path.join(job_dir, 'worker.log'), 'w')
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--run-job', job_dir],
+                                   cwd=os.path.dirname(os.path.abspath(__file__)), stdout=log,
+                                   stderr=subprocess.STDOUT, env={**os.environ, 'MPLBACKEND': 'Agg'})
+        log.close()
+        self._processes[job_id] = process
+    
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if not self._running:
+                    return
+                for job_id, process in list(self._processes.items()):
+                    if process.poll() is not None:
+                        del self._processes[job_id]
+                        # The worker records its own result; a crash leaves the job unfinished
+                        if read_job(os.path.join(self.directory, job_id))['status'] not in TERMINAL_STATUSES:
+                            self._finish(job_id, 'failed', f'Worker exited with code {process.returncode}')
+                while self._queue and len(self._processes) < self.max_concurrent:
+                    self._start(self._queue.popleft())
+                self._lock.wait(self.poll_interval)
+    
+    def close(self, cancel_running=True):
+        """
+        Stop dispatching; queued jobs stay queued for the next runner
+        """
+        with self._lock:
+            self._running = False
+            self._lock.notify()
+        self._dispatcher.join()
+        if cancel_running:
+            for job_id in list(self._processes):
+                self.cancel(job_id)
+
+class TrainingJobRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints: POST /jobs, GET /jobs, GET /jobs/<id>, POST /jobs/<id>/cancel
+    
+    GET /jobs/<id>/events?since=N returns the progress events from N on,
+    or streams them as Server-Sent Events until the job ends when the
+    request accepts text/event-stream.
+    """
+    
+    runner = None
+    
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _route(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        return parts, parse_qs(url.query)
+    
+    def do_GET(self):
+        parts, query = self._route()
+        try:
+            if parts == ['health']:
+                self._send_json(200, {'success': True, 'status': 'ok'})
+            elif parts == ['jobs']:
+                self._send_json(200, {'success': True, 'jobs': self.runner.list_jobs()})
+            elif len(parts) == 2 and parts[0] == 'jobs':
+                self._send_json(200, {'success': True, 'job': self.runner.get(parts[1])})
+            elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+                since = int(query.get('since', ['0'])[0])
+                if 'text/event-stream' in self.headers.get('Accept', ''):
+                    self._stream_events(parts[1], since)
+                else:
+                    self._send_json(200, {'success': True, 'events': self.runner.events(parts[1], since)})
+            else:
+                self._send_json(404, {'success': False, 'message': 'Not found'})
+        except KeyError:
+            self._send_json(404, {'success': False, 'message': 'Unknown job'})
+        except ValueError:
+            self._send_json(400, {'success': False, 'message': 'Invalid since parameter'})
+    
+    def _stream_events(self, job_id, since):
+        self.runner.get(job_id)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        while True:
+            for event in self.runner.events(job_id, since):
+                self.wfile.write(f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+                since = event['seq'] + 1
+            self.wfile.flush()
+            if self.runner.get(job_id)['status'] in TERMINAL_STATUSES and not self.runner.events(job_id, since):
+                return
+            time.sleep(self.runner.poll_interval)
+    
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'success': False, 'message': 'Invalid JSON body'})
+            return
+        
+        parts, _ = self._route()
+        if parts == ['jobs']:
+            try:
+                job = self.runner.submit(payload.get('models'), payload.get('n_jobs'))
+            except ValueError as e:
+                self._send_json(400, {'success': False, 'message': str(e)})
+                return
+            self._send_json(202, {'success': True, 'job': job})
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+            try:
+                cancelled = self.runner.cancel(parts[1])
+            except KeyError:
+                self._send_json(404, {'success': False, 'message': 'Unknown job'})
+                return
+            self._send_json(200 if cancelled else 409, {'success': cancelled, 'job': self.runner.get(parts[1])})
+        else:
+            self._send_json(404, {'success': False, 'message': 'Not found'})
+    
+    def log_message(self, format, *args):
+        pass
+
+def create_server(runner, host='127.0.0.1', port=8002):
+    """
+    Build the training job HTTP server around a runner
+    """
+    handler = type('BoundTrainingJobRequestHandler', (TrainingJobRequestHandler,), {'runner': runner})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    """
+    Run the local training job server, or (internally) one job's worker
+    """
+    parser = argparse.ArgumentParser(description='Run model training jobs in the background')
+    parser.add_argument('--directory', default=DEFAULT_JOBS_DIR, help='Where jobs and their results are kept')
+    parser.add_argument('--max-concurrent', type=int, default=1, help='Jobs allowed to train at the same time')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8002)
+    parser.add_argument('--run-job', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.run_job:
+        # Die quietly when cancelled; the runner records the cancellation
+        signal.signal(signal.SIGTERM, lambda *_: os._exit(1))
+        run_job(args.run_job)
+        return
+    
+    runner = TrainingJobRunner(args.directory, args.max_concurrent)
+    server = create_server(runner, args.host, args.port)
+    print(f"Training job server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        runner.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import json
+import numpy as np
+
+class FlatTreeEnsemble:
+    """
+    Tree ensemble flattened into contiguous NumPy node arrays
+    
+    All trees share one node table. Leaves point back to themselves, so a
+    batch is scored by stepping every (row, tree) pair down one level at a
+    time, dropping pairs that reached a leaf, with no per-tree Python loop. A row goes left
+    when feature <= threshold, or when the feature is NaN and missing_left
+    is set for the node.
+    
+    value also holds the expected output of every internal node, which
+    contributions() uses for tree-path attribution.
+    """
+    
+    ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots']
+    
+    def __init__(self, kind, classes, max_depth, feature, threshold, left, right, missing_left,
+                 value, roots, base_margin=0.0, node_values=True):
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.base_margin = float(base_margin)
+        self.node_values = bool(node_values)
+        self.n_estimators = len(roots)
+    
+    @classmethod
+    def from_random_forest(cls, model):
+        """
+        Flatten a fitted RandomForestClassifier
+        """
+        features, thresholds, lefts, rights, missing_lefts, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int32) + offset
+            is_leaf = tree.children_left == -1
+            
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32))
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+            missing_go_to_left = getattr(tree, 'missing_go_to_left', None)
+            if missing_go_to_left is None:
+                missing_go_to_left = np.zeros(n_nodes, dtype=bool)
+            missing_lefts.append(np.asarray(missing_go_to_left, dtype=bool))
+            
+            # Normalize leaf values the way DecisionTreeClassifier.predict_proba does
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+        
+        return cls(
+            kind='random_forest',
+            classes=model.classes_,
+            max_depth=max_depth,
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing_lefts),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32)
+        )
+    
+    @classmethod
+    def from_xgboost(cls, model):
+        """
+        Flatten a fitted binary XGBClassifier from its JSON model dump
+        """
+        booster = model.get_booster()
+        learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+        objective = learner['objective']['name']
+        if objective != 'binary:logistic' or learner['gradient_booster']['name'] != 'gbtree':
+            raise ValueError(f"Only binary:logistic gbtree models can be flattened, got {objective}")
+        
+        trees = learner['gradient_booster']['model']['trees']
+        best_iteration = booster.attr('best_iteration')
+        if best_iteration is not None:
+            # predict_proba only uses the trees up to the early-stopping iteration
+            trees = trees[:int(best_iteration) + 1]
+        
+        features, thresholds, lefts, rights, missing_lefts, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for tree in trees:
+            left_children = np.asarray(tree['left_children'], dtype=np.int64)
+            right_children = np.asarray(tree['right_children'], dtype=np.int64)
+            split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            n_nodes = len(left_children)
+            node_ids = np.arange(n_nodes, dtype=np.int32) + offset
+            is_leaf = left_children == -1
+            
+            lefts.append(np.where(is_leaf, node_ids, left_children + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, node_ids, right_children + offset).astype(np.int32))
+            features.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            
+            # XGBoost goes left on x < t in float32; x <= the next float32 below t is the same test
+            below = np.nextafter(split_conditions, np.float32(-np.inf))
+            thresholds.append(below.astype(np.float64))
+            missing_lefts.append(np.asarray(tree['default_left'], dtype=bool))
+            
+            # Leaf margins are stored in split_conditions; internal nodes get the
+            # hessian-weighted mean of their children, as XGBoost's approximate contributions do
+            value = np.where(is_leaf, split_conditions, 0.0).astype(np.float64)
+            cover = np.asarray(tree['sum_hessian'], dtype=np.float64)
+            for node in range(n_nodes - 1, -1, -1):
+                if not is_leaf[node]:
+                    left, right = left_children[node], right_children[node]
+                    value[node] = (cover[left] * value[left] + cover[right] * value[right]) / cover[node]
+            values.append(value[:, np.newaxis])
+            
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, cls._depth(left_children, right_children))
+        
+        base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+        return cls(
+            kind='xgboost',
+            classes=model.classes_,
+            max_depth=max_depth,
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing_lefts),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            base_margin=np.log(base_score / (1.0 - base_score))
+        )
+    
+    @classmethod
+    def from_model(cls, model):
+        """
+        Flatten a supported tree model, or return None for anything else
+        """
+        if isinstance(model, cls):
+            return model
+        # Imported here so scoring a flattened ensemble needs only NumPy
+        from sklearn.ensemble import RandomForestClassifier
+        if isinstance(model, RandomForestClassifier):
+            return cls.from_random_forest(model)
+        if hasattr(model, 'get_booster') and getattr(model, 'booster', 'gbtree') in (None, 'gbtree'):
+            try:
+                return cls.from_xgboost(model)
+            except ValueError:
+                return None
+        return None
+    
+    @staticmethod
+    def _depth(left_children, right_children):
+        """
+        Depth of a tree given its child index arrays
+        """
+        depth = np.zeros(len(left_children), dtype=np.int64)
+        for node in range(len(left_children)):
+            if left_children[node] != -1:
+                depth[left_children[node]] = depth[node] + 1
+                depth[right_children[node]] = depth[node] + 1
+        return int(depth.max())
+    
+    def arrays(self):
+        """
+        Node arrays by name, for saving as separate .npy files
+        """
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+    
+    def metadata(self):
+        """
+        JSON-serializable attributes needed next to the node arrays
+        """
+        return {
+            'kind': self.kind,
+            'classes': self.classes_.tolist(),
+            'max_depth': self.max_depth,
+            'base_margin': self.base_margin,
+            'node_values': self.node_values
+        }
+    
+    @classmethod
+    def from_arrays(cls, metadata, arrays):
+        """
+        Rebuild an ensemble from metadata() and arrays(), e.g. memory-mapped .npy files
+        """
+        return cls(
+            kind=metadata['kind'],
+            classes=metadata['classes'],
+            max_depth=metadata['max_depth'],
+            base_margin=metadata.get('base_margin', 0.0),
+            # XGBoost artifacts written before internal node values were stored cannot be explained
+            node_values=metadata.get('node_values', metadata['kind'] != 'xgboost'),
+            **{name: arrays[name] for name in cls.ARRAY_NAMES}
+        )
+    
+    def _leaves(self, X):
+        """
+        Leaf node index for every (row, tree) pair
+        """
+        # sklearn compares float32 features against the float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        has_missing = np.isnan(flat_X).any()
+        
+        # One flat slot per (row, tree) pair; only pairs not yet at a leaf stay active
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_estimators)
+        active = np.flatnonzero(self.left[nodes] != nodes)
+        for _ in range(self.max_depth):
+            if active.size == 0:
+                break
+            current = nodes[active]
+            x = flat_X[row_offsets[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_left[current]
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            active = active[self.left[following] != following]
+        return nodes.reshape(n_rows, self.n_estimators)
+    
+    def predict_proba(self, X, chunk_size=4096):
+        """
+        Class probabilities, scored in row chunks to bound the node index matrix
+        """
+        X = np.asarray(X)
+        n_classes = len(self.classes_)
+        proba = np.empty((X.shape[0], n_classes), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            leaves = self._leaves(X[start:start + chunk_size])
+            if self.kind == 'xgboost':
+                margin = self.base_margin + self.value[leaves, 0].sum(axis=1)
+                prob_pass = 1.0 / (1.0 + np.exp(-margin))
+                proba[start:start + chunk_size, 0] = 1.0 - prob_pass
+                proba[start:start + chunk_size, 1] = prob_pass
+            else:
+                proba[start:start + chunk_size] = self.value[leaves].sum(axis=1) / self.n_estimators
+        return proba
+    
+    def contributions(self, X, chunk_size=4096):
+        """
+        Tree-path attribution: per-row bias and (n_rows, n_features) feature contributions
+        
+        Each split a row passes through credits its feature with the change in
+        the node's expected output. The bias plus the contributions of a row
+        add up exactly to the probability of classes_[1] for random forests,
+        and to the log-odds margin for XGBoost.
+        """
+        if not self.node_values:
+            raise ValueError("This ensemble was saved without internal node values, re-export it to explain predictions")
+        X = np.asarray(X)
+        n_rows, n_features = X.shape
+        node_value = self.value[:, 0] if self.kind == 'xgboost' else self.value[:, 1]
+        
+        bias = float(node_value[self.roots].sum())
+        contributions = np.zeros((n_rows, n_features), dtype=np.float64)
+        for start in range(0, n_rows, chunk_size):
+            X_chunk = np.ascontiguousarray(X[start:start + chunk_size], dtype=np.float32)
+            n_chunk = X_chunk.shape[0]
+            flat_X = X_chunk.ravel()
+            has_missing = np.isnan(flat_X).any()
+            
+            # Same level-synchronous traversal as _leaves, accumulating value deltas per (row, feature)
+            nodes = np.tile(self.roots, n_chunk)
+            row_offsets = np.repeat(np.arange(n_chunk, dtype=np.int64) * n_features, self.n_estimators)
+            totals = np.zeros(n_chunk * n_features, dtype=np.float64)
+            active = np.flatnonzero(self.left[nodes] != nodes)
+            for _ in range(self.max_depth):
+                if active.size == 0:
+                    break
+                current = nodes[active]
+                slots = row_offsets[active] + self.feature[current]
+                x = flat_X[slots]
+                go_left = x <= self.threshold[current]
+                if has_missing:
+                    go_left |= np.isnan(x) & self.missing_left[current]
+                following = np.where(go_left, self.left[current], self.right[current])
+                totals += np.bincount(slots, weights=node_value[following] - node_value[current],
+                                      minlength=totals.size)
+                nodes[active] = following
+                active = active[self.left[following] != following]
+            contributions[start:start + n_chunk] = totals.reshape(n_chunk, n_features)
+        
+        if self.kind == 'xgboost':
+            return np.full(n_rows, self.base_margin + bias), contributions
+        return np.full(n_rows, bias / self.n_estimators), contributions / self.n_estimators
+    
+    def predict(self, X):
+        """
+        Class labels from the highest probability
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)